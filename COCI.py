@@ -3,6 +3,7 @@
 import streamlit as st
 import configparser
 from classes.visualiser import ConferenceVisualiser
+from classes import metrics
 
 def read_config_file():
     if 'config' not in st.session_state:
@@ -30,6 +31,7 @@ def main():
     check_page_change("home")
     
     config = st.session_state['config']
+    metrics.start_from_config(config)
     vis = ConferenceVisualiser()
     
     st.set_page_config(
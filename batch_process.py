@@ -0,0 +1,276 @@
+import configparser
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+
+from classes import metrics
+from classes.job_ledger import JobLedger
+from classes.orchestrator import Orchestrator
+from classes.pipeline import Pipeline
+from classes.storage import ConferenceStorage
+from classes.bulk_writer import with_bulk_writes
+from classes.timing import StageTimer, merge_summaries
+
+# Per-process state, created once by init_worker
+worker = {}
+
+def read_config() -> configparser.ConfigParser:
+    config = configparser.ConfigParser()
+    config.read('config.ini')
+    return config
+
+def init_worker(ledger_path: str = None, enable_metrics: bool = False):
+    """Build the orchestrator, storage and ledger once per worker process and preload the local models."""
+    if enable_metrics:
+        # Before the storage is created, so that its MongoDB client is monitored
+        metrics.enable()
+    from classes.topics import load_embedding_model, load_openalex_topics
+    from classes.conference import load_venue_dataset
+
+    config = read_config()
+    worker["orchestrator"] = Orchestrator.from_config(config)
+    worker["storage"] = ConferenceStorage(config['FOLDERS']['destination_folder'])
+    worker["ledger"] = JobLedger(ledger_path) if ledger_path else None
+
+    load_embedding_model()
+    load_openalex_topics()
+    for name in ['DBLP', 'AIDA', 'ConfIDent']:
+        load_venue_dataset(name)
+
+def mark_done(ledger: JobLedger, filenames: list) -> None:
+    """Mark saved files as done in the ledger and drop their stage outputs."""
+    for filename in filenames:
+        ledger.set_status(filename, "done")
+        ledger.clear(filename)
+
+def process_file(filepath: str, mild_force: bool = False, save: bool = True) -> dict:
+    """
+    Process one CfP in a worker process and save it (or, with save=False, return what to save in
+    result["save"], for the main process to write; the ledger checkpoints are then kept until
+    the main process has written it). Errors are reported, not raised.
+    """
+    start = time.monotonic()
+    filename = Path(filepath).name
+    storage = worker["storage"]
+    ledger = worker["ledger"]
+    timer = StageTimer(filename, worker["orchestrator"].timing_log)
+    try:
+        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+            cfp_text = f.read()
+
+        cached_llm_result = None
+        if mild_force and storage.is_processed(filename):
+            cached_llm_result = storage.load(filename).get("llm-output")
+
+        checkpoint = ledger.checkpoint(filename) if ledger else None
+        conf, llm_result = worker["orchestrator"].process(cfp_text, cached_llm_result=cached_llm_result, checkpoint=checkpoint, timer=timer)
+        to_save = (filename, conf.to_dict(), llm_result, cfp_text)
+        if save:
+            with timer.stage("save"):
+                storage.save(*to_save)
+        if ledger and save:
+            mark_done(ledger, [filename])
+        metrics.record_document("done")
+        return {
+            "file": filepath,
+            "status": "done",
+            "event": conf.name,
+            "organisers": len(conf.organisers.to_dict()) if conf.organisers else 0,
+            "seconds": time.monotonic() - start,
+            "timings": timer.summary(),
+            **({} if save else {"save": to_save})
+        }
+    except Exception as e:
+        if ledger:
+            ledger.set_status(filename, "failed", f"{type(e).__name__}: {e}")
+        metrics.record_document("failed")
+        return {
+            "file": filepath,
+            "status": "failed",
+            "error": f"{type(e).__name__}: {e}",
+            "seconds": time.monotonic() - start,
+            "timings": timer.summary()
+        }
+
+def collect_files(folders: list, pattern: str) -> list:
+    files = []
+    for folder in folders:
+        path = Path(folder)
+        if path.is_file():
+            files.append(path)
+        else:
+            files.extend(sorted(p for p in path.rglob(pattern) if p.is_file()))
+    return files
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless COCI batch processing of whole folders of Calls for Papers")
+    parser.add_argument("folders", nargs="+", type=str, help="Folders (searched recursively) or files to process")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes (default: number of cores)")
+    parser.add_argument("--pattern", type=str, default="*.txt", help="Filename pattern of the CfPs (default: *.txt)")
+    parser.add_argument("--mode", choices=["pool", "pipeline"], default="pool",
+                        help="pool: whole documents on worker processes; pipeline: one process with overlapping stages (default: pool)")
+    parser.add_argument("--llm-workers", type=int, default=4, help="Pipeline mode: concurrent LLM calls")
+    parser.add_argument("--openalex-workers", type=int, default=4, help="Pipeline mode: documents enriched via OpenAlex concurrently")
+    parser.add_argument("--queue-size", type=int, default=8, help="Pipeline mode: documents waiting between two stages")
+    parser.add_argument("--ledger", type=str, default=None,
+                        help="SQLite job ledger: the output of each stage is saved so that failed documents resume where they stopped")
+    parser.add_argument("--bulk-size", type=int, default=None,
+                        help="Buffer MongoDB saves and write them in bulk every N files (default: bulk_size in the [MONGODB] section, 0 disables)")
+    parser.add_argument("--bulk-seconds", type=float, default=None,
+                        help="Write buffered MongoDB saves at least this often (default: bulk_seconds in the [MONGODB] section, or 5)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Serve Prometheus metrics on this port while the batch runs (default: port in the [METRICS] section, 0 disables)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--force", action="store_true", help="Reprocess files that have already been processed")
+    mode.add_argument("--mild-force", action="store_true", help="Reprocess already processed files reusing their LLM output")
+    args = parser.parse_args()
+
+    config = read_config()
+    if args.metrics_port is None:
+        args.metrics_port = config.getint('METRICS', 'port', fallback=0)
+    args.metrics = False
+    if args.metrics_port > 0:
+        # In pool mode, the samples of the worker processes are shared through files
+        args.metrics = metrics.start_server(args.metrics_port, multiprocess=args.mode == "pool")
+    storage = ConferenceStorage(config['FOLDERS']['destination_folder'])
+    Path(config['FOLDERS']['destination_folder']).mkdir(parents=True, exist_ok=True)
+
+    files = collect_files(args.folders, args.pattern)
+    if args.force or args.mild_force:
+        to_process = files
+    else:
+        # One query (or folder listing) for the whole batch
+        exists = storage.exists_many([f.name for f in files])
+        to_process = []
+        for f in files:
+            processed = exists[f.name]
+            metrics.record_cache("processed", processed)
+            if not processed:
+                to_process.append(f)
+    print(f"Found {len(files)} files, {len(files) - len(to_process)} already processed, {len(to_process)} to process.")
+    if not to_process:
+        return
+
+    ledger = JobLedger(args.ledger) if args.ledger else None
+    if ledger:
+        if args.force or args.mild_force:
+            for f in to_process:
+                ledger.clear(f.name)
+        else:
+            resuming = [f for f in to_process if ledger.stages(f.name)]
+            if resuming:
+                print(f"{len(resuming)} files will resume from the stages saved in {args.ledger}.")
+
+    if args.bulk_size is None:
+        args.bulk_size = config.getint('MONGODB', 'bulk_size', fallback=0)
+    if args.bulk_seconds is None:
+        args.bulk_seconds = config.getfloat('MONGODB', 'bulk_seconds', fallback=5.0)
+    writer = None
+    if args.bulk_size > 0:
+        # The checkpoints of a file stay in the ledger until its buffered save has been written
+        on_flush = (lambda filenames: mark_done(ledger, filenames)) if ledger else None
+        storage, writer = with_bulk_writes(storage, args.bulk_size, args.bulk_seconds, on_flush)
+
+    start = time.monotonic()
+    try:
+        if args.mode == "pipeline":
+            results = run_pipeline(config, storage, to_process, args, buffered=writer is not None)
+        else:
+            results = run_pool(to_process, args, storage if writer else None)
+    finally:
+        try:
+            if writer:
+                writer.close()
+                print(f"MongoDB bulk writes: {writer.documents} files in {writer.flushes} flushes ({writer.seconds:.1f}s).")
+        finally:
+            if ledger:
+                ledger.close()
+
+    elapsed = time.monotonic() - start
+    failed = [r for r in results if r["status"] != "done"]
+    print(f"Done. Processed {len(results) - len(failed)} files, {len(failed)} failed, in {elapsed:.1f}s ({len(results) / elapsed * 60:.1f} files/min).")
+    print_timings(merge_summaries([r["timings"] for r in results]))
+
+def print_timings(summary: dict) -> None:
+    """Time spent per stage over the whole batch, slowest first."""
+    print("Stage timings (total / calls / mean / max):")
+    for stage, entry in sorted(summary.items(), key=lambda item: item[1]["total"], reverse=True):
+        print(f"  {stage:<32} {entry['total']:9.1f}s {entry['count']:6d} {entry['total'] / entry['count']:8.3f}s {entry['max']:8.3f}s")
+
+def print_result(position: int, total: int, result: dict) -> None:
+    if result["status"] == "done":
+        print(f"[{position}/{total}] {result['file']}: {result['event']} ({result['organisers']} organisers) in {result['seconds']:.1f}s")
+    else:
+        print(f"[{position}/{total}] {result['file']}: FAILED after {result['seconds']:.1f}s - {result['error']}")
+
+def run_pool(to_process: list, args, storage=None) -> list:
+    """With a storage, the workers only process the files and the main process saves them (buffered MongoDB saves)."""
+    results = []
+    # "spawn" gives each worker a clean interpreter: no MongoDB client or model state is inherited through fork
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=get_context("spawn"), initializer=init_worker, initargs=(args.ledger, args.metrics)) as executor:
+        futures = [executor.submit(process_file, str(f), args.mild_force, storage is None) for f in to_process]
+        for position, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            if "save" in result:
+                try:
+                    storage.save(*result.pop("save"))
+                except Exception as e:
+                    # The other files go on; this one keeps its ledger checkpoints
+                    result.update({"status": "failed", "error": f"save: {type(e).__name__}: {e}"})
+            results.append(result)
+            print_result(position, len(futures), result)
+    return results
+
+def run_pipeline(config, storage, to_process: list, args, buffered: bool = False) -> list:
+    """With buffered saves, the ledger entries of a file are cleared by the writer once it is written."""
+    init_worker(args.ledger, args.metrics)
+    ledger = worker["ledger"]
+    pipeline = Pipeline(worker["orchestrator"], storage, llm_workers=args.llm_workers,
+                        openalex_workers=args.openalex_workers, queue_size=args.queue_size)
+
+    def jobs():
+        for f in to_process:
+            job = {"filename": f.name, "path": str(f)}
+            try:
+                with open(f, 'r', encoding='utf-8', errors='replace') as handle:
+                    job["cfp_text"] = handle.read()
+            except OSError as e:
+                # Reported as a failed file by on_done, the other files go on
+                job["error"] = f"read: {type(e).__name__}: {e}"
+                yield job
+                continue
+            if ledger:
+                job["checkpoint"] = ledger.checkpoint(f.name)
+            if args.mild_force and storage.is_processed(f.name):
+                job["cached_llm_result"] = storage.load(f.name).get("llm-output")
+            yield job
+
+    results = []
+    def on_done(job):
+        conf = job.get("conf")
+        result = {"file": job["path"], "seconds": job["seconds"], "stage_seconds": job["stage_seconds"], "timings": job["timer"].summary()}
+        if job["error"]:
+            result.update({"status": "failed", "error": job["error"]})
+            metrics.record_document("failed")
+            if ledger:
+                ledger.set_status(job["filename"], "failed", job["error"])
+        else:
+            if ledger and not buffered:
+                mark_done(ledger, [job["filename"]])
+            metrics.record_document("done")
+            result.update({
+                "status": "done",
+                "event": conf.name,
+                "organisers": len(conf.organisers.to_dict()) if conf.organisers else 0
+            })
+        results.append(result)
+        print_result(len(results), len(to_process), result)
+
+    pipeline.run(jobs(), on_done=on_done)
+    return results
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+End-to-end benchmark: replays a folder of CfPs through Orchestrator.process against recorded
+model responses and a local stand-in of the OpenAlex API, and reports per-stage latency,
+throughput and peak memory.
+
+    python -m benchmarks.end_to_end --record      # once, with API keys: record the fixtures
+    python -m benchmarks.end_to_end               # offline replay
+    python -m benchmarks.end_to_end --compare benchmarks/results/<previous>.json
+"""
+import argparse
+import configparser
+import json
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pyalex
+
+from classes.orchestrator import Orchestrator
+from classes.storage import StorageToFile
+from classes.timing import StageTimer, merge_summaries
+from benchmarks.fixtures import OpenAlexFixtureServer, use_llm_fixtures
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is in KB on Linux and in bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_document(orchestrator: Orchestrator, storage: StorageToFile, path: Path) -> dict:
+    timer = StageTimer(path.name)
+    start = time.monotonic()
+    try:
+        cfp_text = path.read_text(encoding='utf-8', errors='replace')
+        conf, llm_result = orchestrator.process(cfp_text, timer=timer)
+        with timer.stage("save"):
+            storage.save(path.name, conf.to_dict(), llm_result, cfp_text)
+        result = {"file": path.name, "status": "done", "organisers": len(conf.organisers.to_dict()) if conf.organisers else 0}
+    except Exception as e:
+        result = {"file": path.name, "status": "failed", "error": f"{type(e).__name__}: {e}"}
+    result["seconds"] = time.monotonic() - start
+    result["timings"] = timer.summary()
+    return result
+
+def compare(current: dict, previous: dict) -> None:
+    print(f"Compared with {previous['started_at']} ({previous.get('label', '')}):")
+    print(f"  throughput {previous['documents_per_minute']:.1f} -> {current['documents_per_minute']:.1f} documents/min, "
+          f"peak RSS {previous['peak_rss_mb']:.0f} -> {current['peak_rss_mb']:.0f} MB")
+    for stage, entry in sorted(current["stages"].items(), key=lambda item: item[1]["total"], reverse=True):
+        before = previous["stages"].get(stage)
+        if before:
+            change = 100 * (entry["mean"] - before["mean"]) / before["mean"] if before["mean"] else 0.0
+            print(f"  {stage:<32} mean {before['mean']:8.4f}s -> {entry['mean']:8.4f}s ({change:+.1f}%)")
+        else:
+            print(f"  {stage:<32} mean {entry['mean']:8.4f}s (new)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproducible end-to-end COCI benchmark with recorded LLM and OpenAlex fixtures")
+    parser.add_argument("folder", nargs="?", default="cfps", help="Folder of CfPs to replay (default: cfps)")
+    parser.add_argument("--fixtures", default="benchmarks/fixtures", help="Folder of the recorded responses")
+    parser.add_argument("--record", action="store_true", help="Call the real model and OpenAlex APIs and save their responses as fixtures")
+    parser.add_argument("--realistic", action="store_true", help="Replay each response with the latency it had when recorded")
+    parser.add_argument("--workers", type=int, default=1, help="Documents processed concurrently (default: 1)")
+    parser.add_argument("--limit", type=int, default=0, help="Only replay the first N documents")
+    parser.add_argument("--output", default="benchmarks/results", help="Folder receiving the JSON report")
+    parser.add_argument("--label", default="", help="Free text stored in the report (e.g. a branch name)")
+    parser.add_argument("--compare", default=None, help="Previous JSON report to compare with")
+    args = parser.parse_args()
+
+    config = configparser.ConfigParser()
+    config.read('config.ini')
+    orchestrator = Orchestrator.from_config(config)
+    llm_fixtures = use_llm_fixtures(orchestrator.llm_wrapper, args.fixtures, args.record, args.realistic)
+    openalex_server = OpenAlexFixtureServer(args.fixtures, args.record, args.realistic).start()
+    pyalex.config.openalex_url = openalex_server.url
+
+    files = sorted(Path(args.folder).glob("*.txt"))
+    if args.limit:
+        files = files[:args.limit]
+    print(f"{'Recording' if args.record else 'Replaying'} {len(files)} calls for papers with {args.workers} worker(s)...")
+
+    results = []
+    started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+    with tempfile.TemporaryDirectory() as dest_folder:
+        storage = StorageToFile(dest_folder)
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+            for result in executor.map(lambda path: run_document(orchestrator, storage, path), files):
+                results.append(result)
+                status = f"{result['organisers']} organisers" if result["status"] == "done" else f"FAILED - {result['error']}"
+                print(f"[{len(results)}/{len(files)}] {result['file']}: {status} in {result['seconds']:.2f}s")
+        elapsed = time.monotonic() - start
+    openalex_server.stop()
+
+    stages = merge_summaries([r["timings"] for r in results])
+    for entry in stages.values():
+        entry["mean"] = entry["total"] / entry["count"]
+    report = {
+        "label": args.label,
+        "started_at": started_at,
+        "mode": "record" if args.record else ("realistic replay" if args.realistic else "replay"),
+        "workers": args.workers,
+        "documents": len(results),
+        "failed": len([r for r in results if r["status"] != "done"]),
+        "seconds": elapsed,
+        "documents_per_minute": len(results) / elapsed * 60 if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "llm_fixture_misses": llm_fixtures.misses,
+        "openalex_fixture_hits": openalex_server.hits,
+        "openalex_fixture_misses": openalex_server.misses,
+        "stages": stages,
+        "documents_detail": results
+    }
+
+    print(f"Processed {report['documents']} documents ({report['failed']} failed) in {elapsed:.1f}s: "
+          f"{report['documents_per_minute']:.1f} documents/min, peak RSS {report['peak_rss_mb']:.0f} MB.")
+    if not args.record and (report["llm_fixture_misses"] or report["openalex_fixture_misses"]):
+        print(f"Missing fixtures: {report['llm_fixture_misses']} model responses, {report['openalex_fixture_misses']} OpenAlex responses "
+              f"(the prompt, the model or the configuration changed since they were recorded).")
+    print("Stage timings (total / calls / mean / max):")
+    for stage, entry in sorted(stages.items(), key=lambda item: item[1]["total"], reverse=True):
+        print(f"  {stage:<32} {entry['total']:9.2f}s {entry['count']:6d} {entry['mean']:8.4f}s {entry['max']:8.4f}s")
+
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    report_path = output / f"end_to_end_{started_at.replace(':', '')}.json"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    print(f"Report saved to {report_path}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(report, json.load(f))
+
+if __name__ == '__main__':
+    main()
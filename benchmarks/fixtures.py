@@ -0,0 +1,174 @@
+import hashlib
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+# Query parameters that identify the caller rather than the request
+IGNORED_PARAMS = {"api_key", "mailto"}
+
+def fixture_key(data) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+def read_fixture(path: Path) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_fixture(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+class LLMFixtures:
+    """Model responses stored by (model, messages), one JSON file per request."""
+    def __init__(self, folder: str):
+        self.folder = Path(folder) / "llm"
+        self.misses = 0
+
+    def path(self, kwargs: dict) -> Path:
+        return self.folder / f"{fixture_key({'model': kwargs.get('model'), 'messages': kwargs.get('messages')})}.json"
+
+
+class ReplayCompletions:
+    """
+    Stand-in for `client.chat.completions` returning recorded responses, either whole or as a
+    stream of small deltas. With `realistic`, each response takes as long as it did when recorded.
+    """
+    def __init__(self, fixtures: LLMFixtures, realistic: bool = False, chunk_chars: int = 40):
+        self.fixtures = fixtures
+        self.realistic = realistic
+        self.chunk_chars = chunk_chars
+
+    def create(self, **kwargs):
+        path = self.fixtures.path(kwargs)
+        if not path.exists():
+            self.fixtures.misses += 1
+            raise KeyError(f"No recorded model response for this prompt ({path.name}); run the benchmark with --record first")
+        fixture = read_fixture(path)
+        content = fixture["content"]
+        if not kwargs.get("stream"):
+            if self.realistic:
+                time.sleep(fixture["seconds"])
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+        return self.stream(content, fixture["seconds"])
+
+    def stream(self, content: str, seconds: float):
+        pieces = [content[i:i + self.chunk_chars] for i in range(0, len(content), self.chunk_chars)] or [""]
+        for piece in pieces:
+            if self.realistic:
+                time.sleep(seconds / len(pieces))
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+
+class RecordingCompletions:
+    """Wraps the real `client.chat.completions` and saves every response as a fixture."""
+    def __init__(self, completions, fixtures: LLMFixtures):
+        self.completions = completions
+        self.fixtures = fixtures
+
+    def create(self, **kwargs):
+        start = time.monotonic()
+        response = self.completions.create(**kwargs)
+        path = self.fixtures.path(kwargs)
+        if not kwargs.get("stream"):
+            write_fixture(path, {"model": kwargs.get("model"), "content": response.choices[0].message.content,
+                                 "seconds": time.monotonic() - start})
+            return response
+        return self.record_stream(response, kwargs.get("model"), path, start)
+
+    def record_stream(self, stream, model: str, path: Path, start: float):
+        content = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                content.append(chunk.choices[0].delta.content)
+            yield chunk
+        write_fixture(path, {"model": model, "content": "".join(content), "seconds": time.monotonic() - start})
+
+
+def use_llm_fixtures(llm_wrapper, folder: str, record: bool = False, realistic: bool = False) -> LLMFixtures:
+    """Route the completions of an LLMWrapper through the fixtures (replay) or through the real API while saving them (record)."""
+    fixtures = LLMFixtures(folder)
+    completions = RecordingCompletions(llm_wrapper.client.chat.completions, fixtures) if record else ReplayCompletions(fixtures, realistic)
+    llm_wrapper.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return fixtures
+
+
+class OpenAlexFixtureServer:
+    """
+    Local stand-in for the OpenAlex API. In replay mode it answers every request with the
+    recorded response (an empty result list if there is none); in record mode it forwards
+    the requests to `upstream` and saves the responses. Point pyalex at `url`.
+    """
+    def __init__(self, folder: str, record: bool = False, realistic: bool = False, upstream: str = "https://api.openalex.org"):
+        self.folder = Path(folder) / "openalex"
+        self.record = record
+        self.realistic = realistic
+        self.upstream = upstream
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.make_handler())
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, name="openalex-fixtures", daemon=True)
+
+    def start(self) -> "OpenAlexFixtureServer":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def path(self, request_path: str) -> Path:
+        parsed = urllib.parse.urlsplit(request_path)
+        params = sorted((k, v) for k, v in urllib.parse.parse_qsl(parsed.query, keep_blank_values=True) if k not in IGNORED_PARAMS)
+        return self.folder / f"{fixture_key({'path': parsed.path, 'params': params})}.json"
+
+    def respond(self, request_path: str) -> tuple:
+        path = self.path(request_path)
+        if self.record:
+            start = time.monotonic()
+            try:
+                with urllib.request.urlopen(self.upstream + request_path, timeout=60) as response:
+                    status, body = response.status, response.read().decode("utf-8")
+            except urllib.error.HTTPError as e:
+                status, body = e.code, e.read().decode("utf-8")
+            if status == 200:
+                write_fixture(path, {"path": request_path.split("?")[0], "status": status, "body": body,
+                                     "seconds": time.monotonic() - start})
+            return status, body
+        if not path.exists():
+            with self.lock:
+                self.misses += 1
+            return 200, json.dumps({"meta": {"count": 0, "page": 1, "per_page": 25, "next_cursor": None}, "results": []})
+        fixture = read_fixture(path)
+        with self.lock:
+            self.hits += 1
+        if self.realistic:
+            time.sleep(fixture["seconds"])
+        return fixture["status"], fixture["body"]
+
+    def make_handler(self):
+        fixture_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, body = fixture_server.respond(self.path)
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
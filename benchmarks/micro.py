@@ -0,0 +1,209 @@
+"""
+Micro-benchmarks of the hot paths: topic mapping, venue matching, storage merges and the
+Explore pages' search and aggregation, on synthetic inputs of increasing size.
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --only merge --sizes 10,100,1000,10000
+    python -m benchmarks.micro --compare benchmarks/results/micro_<previous>.json
+"""
+import argparse
+import copy
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from classes.search import aggregate_organisers, search_events, search_organisers
+from classes.storage import merge_event_data, merge_organisers
+
+FIRST_NAMES = ["Anna", "Marco", "Wei", "Fatima", "John", "Elena", "Kenji", "Sofia", "Pierre", "Aisha", "Lukas", "Maria"]
+LAST_NAMES = ["Rossi", "Smith", "Chen", "Garcia", "Müller", "Kumar", "Tanaka", "Dubois", "Silva", "Novak", "Osei", "Berg"]
+INSTITUTIONS = ["The Open University", "University of Oxford", "Tsinghua University", "MIT", "Sapienza University of Rome",
+                "TU Delft", "University of Tokyo", "INRIA", "Max Planck Institute for Informatics", "University of Cape Town"]
+SUBJECTS = ["knowledge graphs", "semantic web", "large language models", "information retrieval", "databases",
+            "computer vision", "human-computer interaction", "software engineering", "distributed systems", "robotics",
+            "natural language processing", "privacy", "recommender systems", "digital libraries", "scholarly data"]
+SERIES = ["International Semantic Web Conference", "Extended Semantic Web Conference", "Conference on Information and Knowledge Management",
+          "International Conference on Very Large Data Bases", "ACM SIGMOD Conference", "European Conference on Information Retrieval",
+          "International Conference on Software Engineering", "Conference on Human Factors in Computing Systems"]
+
+def make_organisers(rng: random.Random, count: int, people: int = None) -> list:
+    """Organisers drawn from a pool of `people` (so that lists overlap), some with ORCID/OpenAlex ids."""
+    people = people or count
+    organisers = []
+    for _ in range(count):
+        person = rng.randrange(people)
+        name = f"{FIRST_NAMES[person % len(FIRST_NAMES)]} {LAST_NAMES[(person // len(FIRST_NAMES)) % len(LAST_NAMES)]} {person}"
+        identified = person % 3 == 0
+        organisers.append({
+            "organiser_name": name,
+            "organiser_affiliation": INSTITUTIONS[person % len(INSTITUTIONS)],
+            "organiser_country": "",
+            "track_name": rng.choice(["Research Track", "Workshops", "Other"]),
+            "openalex_name": name if identified else "",
+            "openalex_page": f"https://openalex.org/A{person}" if identified else "",
+            "orcid": f"https://orcid.org/0000-0000-0000-{person:04d}" if person % 6 == 0 else "",
+            "affiliation_ror": "",
+            "affiliation_provenance": "LLM",
+            "verified": identified
+        })
+    return organisers
+
+def make_topics(rng: random.Random, count: int) -> list:
+    return [f"{rng.choice(SUBJECTS)} for {rng.choice(SUBJECTS)}, {rng.choice(SUBJECTS)} and applications {i}" for i in range(count)]
+
+def make_event(rng: random.Random, index: int, organisers: int = 20, topics: int = 10) -> dict:
+    series = rng.choice(SERIES)
+    return {
+        "_id": index,
+        "index": index,
+        "processed": {
+            "event_name": f"{series} {2000 + index % 26}",
+            "event_acronym": "".join(word[0] for word in series.split() if word[0].isupper()),
+            "conference_series": series,
+            "colocated_with": "",
+            "year": str(2000 + index % 26),
+            "location": "",
+            "DBLP": {}, "AIDA": {}, "ConfIDent": {},
+            "organisers": make_organisers(rng, organisers, people=5000),
+            "topics": make_topics(rng, topics),
+            "enhanced_topics": {}
+        }
+    }
+
+def bench_merge_organisers(rng, size):
+    existing = make_organisers(rng, size, people=size)
+    new = make_organisers(rng, size, people=size)
+    # merge_organisers changes its inputs: fresh copies for each run, made outside the timed region
+    return (lambda: (copy.deepcopy(existing), copy.deepcopy(new))), (lambda inputs: merge_organisers(*inputs))
+
+def bench_merge_event_data(rng, size):
+    existing = make_event(rng, 1, organisers=size, topics=max(1, size // 10))["processed"]
+    new = make_event(rng, 2, organisers=size, topics=max(1, size // 10))["processed"]
+    return (lambda: (copy.deepcopy(existing), copy.deepcopy(new))), (lambda inputs: merge_event_data(*inputs))
+
+def bench_search_events(rng, size):
+    events = [make_event(rng, i, organisers=0) for i in range(size)]
+    return lambda: search_events(events, "semantic web")
+
+def bench_aggregate_organisers(rng, size):
+    events = [make_event(rng, i) for i in range(size)]
+    return lambda: aggregate_organisers(events)
+
+def bench_search_organisers(rng, size):
+    organisers = aggregate_organisers([make_event(rng, i) for i in range(max(1, size // 20))])
+    organisers = (organisers * (size // max(1, len(organisers)) + 1))[:size]
+    return lambda: search_organisers(organisers, "Anna Rossi")
+
+def bench_extract_subtopics(rng, size):
+    from classes.topics import Topics
+    topics = Topics([])
+    topic_list = make_topics(rng, size)
+    return lambda: [topics.extract_subtopics(topic) for topic in topic_list]
+
+def bench_match_openalex_topics(rng, size):
+    from classes.topics import Topics
+    topic_list = make_topics(rng, size)
+    def run():
+        topics = Topics(topic_list)
+        topics.match_openalex_topics()
+    return run
+
+def bench_match_venues(rng, size):
+    from classes.conference import Conference
+    series = [f"{rng.choice(SERIES)} {i}" for i in range(size)]
+    def run():
+        for name in series:
+            Conference(name, "", name, "", "2026", "").match_conference_with_other_datasets()
+    return run
+
+# name: (benchmark, what "size" counts, needs the local models and FAISS indexes)
+BENCHMARKS = {
+    "merge_organisers": (bench_merge_organisers, "organisers per list", False),
+    "merge_event_data": (bench_merge_event_data, "organisers per event", False),
+    "search_events": (bench_search_events, "events", False),
+    "aggregate_organisers": (bench_aggregate_organisers, "events (20 organisers each)", False),
+    "search_organisers": (bench_search_organisers, "organisers", False),
+    "extract_subtopics": (bench_extract_subtopics, "topics", True),
+    "match_openalex_topics": (bench_match_openalex_topics, "topics", True),
+    "match_venues": (bench_match_venues, "conferences", True)
+}
+
+def measure(bench, repeat: int) -> dict:
+    """
+    Time a benchmark: a function, or a (setup, func) pair where setup() runs before every call,
+    outside the timed region, and func receives its result.
+    """
+    setup, func = bench if isinstance(bench, tuple) else (None, bench)
+    def call():
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        return time.perf_counter() - start
+    call()  # warm-up (lazy model loading, caches)
+    runs = [call() for _ in range(repeat)]
+    return {"min": min(runs), "median": statistics.median(runs), "runs": runs}
+
+def compare(results: dict, previous: dict, tolerance: float) -> list:
+    """Benchmarks whose median is more than `tolerance` slower than in the previous report."""
+    regressions = []
+    for name, sizes in results.items():
+        for size, entry in sizes.items():
+            before = previous.get("results", {}).get(name, {}).get(size)
+            if not before:
+                continue
+            change = (entry["median"] - before["median"]) / before["median"] if before["median"] else 0.0
+            flag = "REGRESSION" if change > tolerance else ""
+            print(f"  {name:<24} {size:>6}  {before['median']:10.5f}s -> {entry['median']:10.5f}s ({100 * change:+.1f}%) {flag}")
+            if change > tolerance:
+                regressions.append(f"{name}[{size}]")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the COCI hot paths on synthetic inputs")
+    parser.add_argument("--only", default="", help="Comma-separated benchmark names (or name prefixes) to run")
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="Input sizes of the pure Python benchmarks")
+    parser.add_argument("--model-sizes", default="10,100,1000", help="Input sizes of the benchmarks using spaCy, the embedding model and FAISS")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark and size (default: 3)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmarks/results", help="Folder receiving the JSON report")
+    parser.add_argument("--label", default="", help="Free text stored in the report (e.g. a branch name)")
+    parser.add_argument("--compare", default=None, help="Previous JSON report to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Slowdown reported as a regression (default: 0.2, i.e. 20%%)")
+    args = parser.parse_args()
+
+    selected = [name for name in BENCHMARKS if not args.only or any(name.startswith(p.strip()) for p in args.only.split(","))]
+    sizes = [int(s) for s in args.sizes.split(",")]
+    model_sizes = [int(s) for s in args.model_sizes.split(",")]
+
+    started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+    results = {}
+    for name in selected:
+        bench, unit, needs_models = BENCHMARKS[name]
+        results[name] = {}
+        for size in (model_sizes if needs_models else sizes):
+            func = bench(random.Random(args.seed), size)
+            entry = measure(func, args.repeat)
+            results[name][str(size)] = entry
+            print(f"{name:<24} {size:>6} {unit:<28} min {entry['min']:10.5f}s  median {entry['median']:10.5f}s")
+
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    report_path = output / f"micro_{started_at.replace(':', '')}.json"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump({"label": args.label, "started_at": started_at, "repeat": args.repeat, "seed": args.seed, "results": results}, f, indent=4)
+    print(f"Report saved to {report_path}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        print(f"Compared with {previous['started_at']} ({previous.get('label', '')}):")
+        regressions = compare(results, previous, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import copy
+import threading
+import time
+from pathlib import Path
+from .storage import StorageBackend, StorageToBoth, StorageToMongo
+
+class BufferedMongoWriter(StorageBackend):
+    """
+    Buffered saves to MongoDB for batch ingestion. Saves are kept in memory and written with
+    StorageToMongo.save_many once `max_documents` files are waiting or the oldest one has waited
+    `max_seconds`. Reads of saved data write the buffer first.
+    `on_flush(filenames)` is called once the saves of these files are written (e.g. to drop their
+    job ledger checkpoints only when the data can no longer be lost).
+    """
+    def __init__(self, storage: StorageToMongo, max_documents: int = 100, max_seconds: float = 5.0, on_flush=None):
+        self.storage = storage
+        self.max_documents = max_documents
+        self.max_seconds = max_seconds
+        self.on_flush = on_flush
+        # Buffered saves that trigger a flush (raised after a failed one, so that it is retried later)
+        self.flush_threshold = max_documents
+        self.lock = threading.RLock()
+        self.pending = []
+        self.first_pending_at = None
+        self.flushes = 0
+        self.documents = 0
+        self.seconds = 0.0
+        self.closed = threading.Event()
+        self.thread = threading.Thread(target=self.flush_periodically, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def save(self, filename: str, conf_dict: dict, llm_output: dict, cfp_text: str = None) -> None:
+        with self.lock:
+            self.pending.append((filename, copy.deepcopy(conf_dict), copy.deepcopy(llm_output), cfp_text))
+            if self.first_pending_at is None:
+                self.first_pending_at = time.monotonic()
+            if len(self.pending) >= self.flush_threshold:
+                self.try_flush()
+
+    def is_processed(self, filename: str) -> bool:
+        stem = Path(filename).stem
+        with self.lock:
+            if any(Path(save[0]).stem == stem for save in self.pending):
+                return True
+        return self.storage.is_processed(filename)
+
+    def load(self, filename: str) -> dict:
+        self.flush()
+        return self.storage.load(filename)
+
+    def update_preferred_threshold(self, filename: str, threshold: float) -> None:
+        self.flush()
+        self.storage.update_preferred_threshold(filename, threshold)
+
+    def exists_many(self, filenames: list) -> dict:
+        with self.lock:
+            pending = {Path(save[0]).stem for save in self.pending}
+        exists = {filename: Path(filename).stem in pending for filename in filenames}
+        missing = [filename for filename, saved in exists.items() if not saved]
+        if missing:
+            exists.update(self.storage.exists_many(missing))
+        return exists
+
+    def load_many(self, filenames: list) -> dict:
+        self.flush()
+        return self.storage.load_many(filenames)
+
+    def save_many(self, saves: list) -> None:
+        for save in saves:
+            self.save(*save)
+
+    def iter_events(self, projection: list = None):
+        self.flush()
+        return self.storage.iter_events(projection)
+
+    def page_events(self, after=None, limit: int = 20, projection: list = None) -> tuple:
+        self.flush()
+        return self.storage.page_events(after, limit, projection)
+
+    def get_event(self, index) -> dict:
+        self.flush()
+        return self.storage.get_event(index)
+
+    def event_cfp_text(self, event: dict, filename: str) -> str:
+        return self.storage.event_cfp_text(event, filename)
+
+    def flush_periodically(self) -> None:
+        while not self.closed.wait(min(1.0, self.max_seconds)):
+            with self.lock:
+                if self.first_pending_at is None or time.monotonic() - self.first_pending_at < self.max_seconds:
+                    continue
+                self.try_flush()
+
+    def try_flush(self) -> None:
+        """Flush, keeping the saves buffered if MongoDB cannot be reached (retried at the next threshold, period or close)."""
+        with self.lock:
+            try:
+                self.flush()
+            except Exception as e:
+                self.flush_threshold = len(self.pending) + self.max_documents
+                print(f"MongoDB bulk write failed, retrying later: {type(e).__name__}: {e}")
+
+    def flush(self) -> None:
+        """Write every buffered save. If it fails, the saves stay buffered (writing them again is harmless)."""
+        with self.lock:
+            if not self.pending:
+                return
+            start = time.monotonic()
+            self.storage.save_many(self.pending)
+            self.flushes += 1
+            self.documents += len(self.pending)
+            self.seconds += time.monotonic() - start
+            saved = [save[0] for save in self.pending]
+            self.pending = []
+            self.first_pending_at = None
+            self.flush_threshold = self.max_documents
+            if self.on_flush:
+                self.on_flush(saved)
+
+    def close(self) -> None:
+        self.closed.set()
+        self.flush()
+
+
+def with_bulk_writes(storage, max_documents: int = 100, max_seconds: float = 5.0, on_flush=None):
+    """
+    Buffer the MongoDB saves of a storage (StorageToMongo, or the MongoDB half of StorageToBoth).
+    Returns the storage to use and the writer to close at the end (None for file storage).
+    """
+    if isinstance(storage, StorageToMongo):
+        writer = BufferedMongoWriter(storage, max_documents, max_seconds, on_flush)
+        return writer, writer
+    if isinstance(storage, StorageToBoth):
+        writer = BufferedMongoWriter(storage.mongo_storage, max_documents, max_seconds, on_flush)
+        storage.mongo_storage = writer
+        return storage, writer
+    return storage, None
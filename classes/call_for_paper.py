@@ -2,6 +2,27 @@ from io import StringIO
 import os
 import re
 
+# Sections whose heading matches these patterns carry no information we extract
+LOW_VALUE_HEADINGS = re.compile(
+    r'\b(submission (instructions|guidelines|procedure|process|details|format)|how to submit|'
+    r'formatting|paper format|page limit|templates?|anonymi[sz](ation|ty) requirements?|double[- ]blind|'
+    r'registration|visa|sponsors|sponsorship|copyright|code of conduct|privacy policy|cookie policy|'
+    r'unsubscribe|mailing list)\b',
+    re.IGNORECASE
+)
+# Mailing-list and newsletter footer lines
+FOOTER_LINES = re.compile(
+    r'(unsubscribe|you (are receiving|received) this|mailing list|listinfo|list-archive|'
+    r'to post to this group|sent from my)',
+    re.IGNORECASE
+)
+# Sections mentioning people, topics or the location of the event are always kept
+PRESERVED_CONTENT = re.compile(
+    r'(committee|chairs?\b|organi[sz](er|ing)|steering|reviewers?\b|topics?\b|areas? of interest|scope|'
+    r'venue|location|address|held in|take place)',
+    re.IGNORECASE
+)
+
 class CallForPaper:
     def __init__(self, source):
         if hasattr(source, "getvalue"):
@@ -16,9 +37,141 @@ class CallForPaper:
         else:
             self.text = str(source)
 
-    def clean(self):
-        """Placeholder for any future text cleaning routines."""
-        pass
+    def clean(self) -> dict:
+        """
+        Remove content that is not needed for the extraction before the text is sent to
+        the model: repeated whitespace, duplicated sections (e.g. navigation menus of
+        scraped pages), submission/formatting/logistics sections and mailing-list footers.
+        Sections mentioning committees, chairs or topics are never removed.
+        The original text is kept in `original_text` and a summary in `cleaning_report`.
+        """
+        self.original_text = self.text
+
+        lines = []
+        for line in self.text.replace('\r\n', '\n').replace('\r', '\n').split('\n'):
+            stripped = line.strip()
+            if not stripped:
+                lines.append('')
+                continue
+            indent = line[:len(line) - len(line.lstrip(' \t'))]
+            lines.append(indent + re.sub(r'[ \t\u00a0]+', ' ', stripped))
+        self.text = re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip('\n')
+
+        kept = []
+        removed = []
+        seen = set()
+        for section in self.split_sections():
+            section_lines = [l.strip() for l in section.split('\n') if l.strip()]
+            heading = section_lines[0]
+            # A single line is a list item (e.g. a committee member listed in two tracks), not a section
+            has_body = len(section_lines) > 1
+            fingerprint = ' '.join(section_lines).lower()
+            preserved = bool(PRESERVED_CONTENT.search(section))
+            # Short blocks (a name and an affiliation) can legitimately repeat under different roles
+            if len(section_lines) > 2 and fingerprint in seen:
+                removed.append(f"{heading} (duplicate)")
+                continue
+            seen.add(fingerprint)
+            is_heading = has_body and not re.match(r'^[-*•●◦▪]', heading)
+            if is_heading and not preserved and LOW_VALUE_HEADINGS.search(heading):
+                removed.append(heading)
+                continue
+            if not preserved:
+                section = '\n'.join(l for l in section.split('\n') if not FOOTER_LINES.search(l))
+                if not section.strip():
+                    removed.append(heading)
+                    continue
+            kept.append(section)
+        self.text = '\n'.join(kept)
+
+        original_tokens = self.estimate_tokens(self.original_text)
+        cleaned_tokens = self.estimate_tokens(self.text)
+        self.cleaning_report = {
+            "original_chars": len(self.original_text),
+            "cleaned_chars": len(self.text),
+            "original_tokens": original_tokens,
+            "cleaned_tokens": cleaned_tokens,
+            "tokens_saved": original_tokens - cleaned_tokens,
+            "removed_sections": removed
+        }
+        return self.cleaning_report
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Rough token count (about four characters per token for English text)."""
+        return (len(text) + 3) // 4
+
+    def split_sections(self) -> list:
+        """
+        Split the text into sections. A section starts at a short, unindented line
+        (e.g. "Program Committee", "TOPICS OF INTEREST") and runs until the next one.
+        """
+        sections = []
+        current = []
+        for line in self.text.split('\n'):
+            stripped = line.strip()
+            is_heading = (
+                stripped
+                and line[:1] not in (' ', '\t')
+                and len(stripped) <= 80
+                and not stripped.endswith(('.', ',', ';'))
+            )
+            if is_heading and any(l.strip() for l in current):
+                sections.append('\n'.join(current))
+                current = []
+            current.append(line)
+        if any(l.strip() for l in current):
+            sections.append('\n'.join(current))
+        return sections
+
+    def split_chunks(self, chunk_size: int, header_size: int = 1500) -> list:
+        """
+        Pack consecutive sections into chunks of at most chunk_size characters.
+        The beginning of the document (event name, dates, location) is repeated
+        at the top of every chunk after the first one so each extraction call
+        still knows which event it is looking at.
+        """
+        if chunk_size <= 0 or len(self.text) <= chunk_size:
+            return [self.text]
+
+        header = self.text[:header_size]
+        cut = header.rfind('\n')
+        if cut > 0:
+            header = header[:cut]
+        budget = max(chunk_size - len(header), chunk_size // 2)
+
+        # Sections longer than the budget are split on line boundaries
+        pieces = []
+        for section in self.split_sections():
+            if len(section) <= budget:
+                pieces.append(section)
+                continue
+            block = []
+            block_len = 0
+            for line in section.split('\n'):
+                if block and block_len + len(line) + 1 > budget:
+                    pieces.append('\n'.join(block))
+                    block = []
+                    block_len = 0
+                block.append(line)
+                block_len += len(line) + 1
+            if block:
+                pieces.append('\n'.join(block))
+
+        chunks = []
+        current = []
+        current_len = 0
+        for piece in pieces:
+            if current and current_len + len(piece) + 1 > budget:
+                chunks.append('\n'.join(current))
+                current = []
+                current_len = 0
+            current.append(piece)
+            current_len += len(piece) + 1
+        if current:
+            chunks.append('\n'.join(current))
+
+        return [chunks[0]] + [f"{header}\n[...]\n{chunk}" for chunk in chunks[1:]]
 
     def get_rendered_html(self) -> str:
         import html
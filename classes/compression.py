@@ -0,0 +1,54 @@
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+METHODS = ("zstd", "zlib", "none")
+
+def compress_text(text: str, method: str = "zlib") -> bytes:
+    """
+    Compress a CfP text with "zstd" (falls back to zlib if zstandard is not installed),
+    "zlib" or "none" (plain UTF-8).
+    """
+    data = text.encode("utf-8")
+    if method == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    if method in ("zstd", "zlib"):
+        return zlib.compress(data, 9)
+    return data
+
+def is_zlib(data: bytes) -> bool:
+    return len(data) >= 2 and data[0] == 0x78 and (data[0] * 256 + data[1]) % 31 == 0
+
+def decompress_text(data) -> str:
+    """Inverse of compress_text. The format is detected from the data; str values (uncompressed legacy data) are returned as they are."""
+    if data is None or isinstance(data, str):
+        return data
+    data = bytes(data)
+    if data.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("This CfP text is compressed with zstd: install the 'zstandard' library to read it.")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    if is_zlib(data):
+        try:
+            return zlib.decompress(data).decode("utf-8")
+        except zlib.error:
+            # Plain text that happens to start like a zlib header (e.g. "x^")
+            pass
+    return data.decode("utf-8")
+
+def compression_method(data) -> str:
+    """Method a stored value was compressed with ("zstd", "zlib" or "none")."""
+    if isinstance(data, (bytes, bytearray)):
+        if bytes(data).startswith(ZSTD_MAGIC):
+            return "zstd"
+        if is_zlib(data):
+            try:
+                zlib.decompress(data)
+                return "zlib"
+            except zlib.error:
+                pass
+    return "none"
@@ -3,11 +3,18 @@ os.environ['FAISS_OPT_LEVEL'] = ''  # do this BEFORE importing any faiss library
 
 import pickle
 import urllib.parse
+from functools import lru_cache
 # pyrefly: ignore [missing-import]
 from rapidfuzz.distance import Levenshtein
-from sentence_transformers import SentenceTransformer
 from .organisers import Organisers
-from .topics import Topics
+from .topics import Topics, load_embedding_model
+from .timing import timed
+
+@lru_cache(maxsize=None)
+def load_venue_dataset(name: str) -> dict:
+    """FAISS index and lookup tables of a venue dataset (DBLP, AIDA, ConfIDent), loaded once per process."""
+    with open(f'data_sources/{name}.pickle', 'rb') as handle:
+        return pickle.load(handle)
 
 class Conference:
     def __init__(self, name: str, acronym: str, series: str, colocated: str, year: str, location: str):
@@ -23,6 +30,8 @@ class Conference:
         self.dblp = {}
         self.aida = {}
         self.confident = {}
+        # StageTimer of the run that produced this conference (not stored)
+        self.timer = None
 
     def set_organisers(self, organisers: Organisers):
         self.organisers = organisers
@@ -30,18 +39,19 @@ class Conference:
     def set_topics(self, topics: Topics):
         self.topics = topics
 
-    def match_conference_with_other_datasets(self, debug=False):
+    def match_conference_with_other_datasets(self, debug=False, timer=None):
         if not self.series:
             return
             
-        model = SentenceTransformer("all-MiniLM-L6-v2")
-        embeddings = model.encode([self.series])
+        model = load_embedding_model()
+        with timed(timer, "venues.encode"):
+            embeddings = model.encode([self.series])
         
         # DBLP Matching
-        with open('data_sources/DBLP.pickle', 'rb') as handle:
-            dblp_confs = pickle.load(handle)
+        dblp_confs = load_venue_dataset('DBLP')
         
-        D, I = dblp_confs["index"].search(embeddings, k=1)
+        with timed(timer, "venues.faiss", dataset="DBLP"):
+            D, I = dblp_confs["index"].search(embeddings, k=1)
         if D[0][0] <= 0.4:
             this_conf_dblp = dblp_confs["sentences"][I[0][0]]
             this_acronym_dblp = dblp_confs["confs"][this_conf_dblp]
@@ -50,10 +60,10 @@ class Conference:
             this_acronym_dblp = ""
 
         # AIDA Matching
-        with open('data_sources/AIDA.pickle', 'rb') as handle:
-            aida_confs = pickle.load(handle)
+        aida_confs = load_venue_dataset('AIDA')
         
-        D, I = aida_confs["index"].search(embeddings, k=1)
+        with timed(timer, "venues.faiss", dataset="AIDA"):
+            D, I = aida_confs["index"].search(embeddings, k=1)
         if D[0][0] <= 0.4:
             this_conf_aida = aida_confs["sentences"][I[0][0]]
             this_acronym_aida = aida_confs["confs"][this_conf_aida]
@@ -62,10 +72,10 @@ class Conference:
             this_acronym_aida = ""
 
         # ConfIDent Matching
-        with open('data_sources/ConfIDent.pickle', 'rb') as handle:
-            confident_confs = pickle.load(handle)
+        confident_confs = load_venue_dataset('ConfIDent')
         
-        D, I = confident_confs["index"].search(embeddings, k=1)
+        with timed(timer, "venues.faiss", dataset="ConfIDent"):
+            D, I = confident_confs["index"].search(embeddings, k=1)
         if D[0][0] <= 0.4:
             this_conf_confident = confident_confs["sentences"][I[0][0]]
             this_id_confident = confident_confs["confs"][this_conf_confident]
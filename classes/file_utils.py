@@ -0,0 +1,19 @@
+import os
+import tempfile
+from pathlib import Path
+
+def atomic_write(path: Path, data) -> None:
+    """
+    Write text or bytes to a temporary file in the same folder and rename it,
+    so that readers never see a partial file.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
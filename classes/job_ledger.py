@@ -0,0 +1,70 @@
+import sqlite3
+import threading
+import time
+from .serialization import dumps, loads
+
+class Checkpoint:
+    """Stage outputs of one document in the ledger."""
+    def __init__(self, ledger, filename: str):
+        self.ledger = ledger
+        self.filename = filename
+
+    def get(self, stage: str):
+        return self.ledger.get(self.filename, stage)
+
+    def put(self, stage: str, data) -> None:
+        self.ledger.put(self.filename, stage, data)
+
+
+class JobLedger:
+    """
+    Persistent record (SQLite) of batch jobs and of the output of each processing stage
+    ("llm-output", "organisers", "topics", "venues"), so that an interrupted batch can
+    resume every document from the stage that failed instead of starting over.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self.lock, self.conn:
+            # WAL lets several batch worker processes use the same ledger
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                filename TEXT PRIMARY KEY, status TEXT, error TEXT, updated_at REAL)""")
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS checkpoints (
+                filename TEXT, stage TEXT, data TEXT, updated_at REAL, PRIMARY KEY (filename, stage))""")
+
+    def checkpoint(self, filename: str) -> Checkpoint:
+        return Checkpoint(self, filename)
+
+    def get(self, filename: str, stage: str):
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM checkpoints WHERE filename = ? AND stage = ?", (filename, stage)).fetchone()
+        return loads(row[0]) if row else None
+
+    def put(self, filename: str, stage: str, data) -> None:
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+                              (filename, stage, dumps(data), time.time()))
+
+    def stages(self, filename: str) -> list:
+        with self.lock:
+            rows = self.conn.execute("SELECT stage FROM checkpoints WHERE filename = ?", (filename,)).fetchall()
+        return [row[0] for row in rows]
+
+    def set_status(self, filename: str, status: str, error: str = None) -> None:
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?)", (filename, status, error, time.time()))
+
+    def get_status(self, filename: str) -> str:
+        with self.lock:
+            row = self.conn.execute("SELECT status FROM jobs WHERE filename = ?", (filename,)).fetchone()
+        return row[0] if row else None
+
+    def clear(self, filename: str) -> None:
+        """Drop the stage outputs of a document (e.g. once it has been saved, or to reprocess it from scratch)."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM checkpoints WHERE filename = ?", (filename,))
+
+    def close(self) -> None:
+        self.conn.close()
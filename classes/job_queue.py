@@ -0,0 +1,85 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from .orchestrator import Orchestrator
+from .timing import StageTimer
+from .metrics import record_document
+
+class ProcessingQueue:
+    """
+    Local background queue for processing CfPs outside the Streamlit script thread.
+    Jobs run on a thread pool, save their results to storage, and keep their status and
+    progress messages in memory so that any page run (or a reloaded tab) can poll them by id.
+    """
+    def __init__(self, orchestrator: Orchestrator, storage, max_workers: int = 2, keep_seconds: int = 3600):
+        self.orchestrator = orchestrator
+        self.storage = storage
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="coci-job")
+        self.keep_seconds = keep_seconds
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, filename: str, cfp_text: str, cached_llm_result: dict = None) -> str:
+        job = self.add_job(filename)
+        self.executor.submit(self.run, job, cfp_text, cached_llm_result)
+        return job["id"]
+
+    def add_cached(self, filename: str, event: str, organisers: int) -> str:
+        """Record a file already in storage as a finished "cached" job, so that it is listed (and polled) like the others."""
+        job = self.add_job(filename)
+        now = time.time()
+        job.update({"status": "cached", "logs": ["Loaded from storage"], "event": event, "organisers": organisers,
+                    "started_at": now, "finished_at": now})
+        return job["id"]
+
+    def add_job(self, filename: str) -> dict:
+        self.prune()
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "filename": filename,
+            "status": "queued",
+            "logs": [],
+            "error": None,
+            "event": "",
+            "organisers": 0,
+            "timings": {},
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None
+        }
+        with self.lock:
+            self.jobs[job_id] = job
+        return job
+
+    def run(self, job: dict, cfp_text: str, cached_llm_result: dict) -> None:
+        job["status"] = "running"
+        job["started_at"] = time.time()
+        timer = StageTimer(job["filename"], self.orchestrator.timing_log)
+        try:
+            conf, llm_result = self.orchestrator.process(cfp_text, progress_callback=job["logs"].append, cached_llm_result=cached_llm_result, timer=timer)
+            job["logs"].append("Saving results...")
+            with timer.stage("save"):
+                self.storage.save(job["filename"], conf.to_dict(), llm_result, cfp_text)
+            job["event"] = conf.name
+            job["organisers"] = len(conf.organisers.to_dict()) if conf.organisers else 0
+            job["status"] = "done"
+        except Exception as e:
+            job["error"] = f"{type(e).__name__}: {e}"
+            job["status"] = "failed"
+        record_document(job["status"])
+        job["timings"] = timer.summary()
+        job["finished_at"] = time.time()
+
+    def get(self, job_id: str) -> dict:
+        """Return the job, or None if it is unknown (e.g. the server was restarted)."""
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def prune(self) -> None:
+        """Forget finished jobs older than keep_seconds."""
+        now = time.time()
+        with self.lock:
+            for job_id in [k for k, j in self.jobs.items() if j["finished_at"] and now - j["finished_at"] > self.keep_seconds]:
+                del self.jobs[job_id]
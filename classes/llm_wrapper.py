@@ -1,19 +1,118 @@
 import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+import openai
 from openai import OpenAI
 from .call_for_paper import CallForPaper
+from .metrics import record_llm
+from .storage import merge_organisers, merge_topics
+
+class OrganiserStreamParser:
+    """
+    Incremental scanner for the JSON object produced by the extraction schema.
+    Text is fed as it is streamed by the model: top-level string fields are
+    collected in `fields` as soon as they are complete, and every object of the
+    "organisers" array is returned by `feed` as soon as its closing brace arrives.
+    """
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.string_start = -1
+        self.expect_key = False
+        self.current_key = None
+        self.in_organisers = False
+        self.object_start = -1
+        self.fields = {}
+
+    def feed(self, text: str) -> list:
+        self.buffer += text
+        completed = []
+        buf = self.buffer
+        for i in range(self.pos, len(buf)):
+            c = buf[i]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif c == '\\':
+                    self.escaped = True
+                elif c == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        value = json.loads(buf[self.string_start:i + 1])
+                        if self.expect_key:
+                            self.current_key = value
+                            self.expect_key = False
+                        else:
+                            self.fields[self.current_key] = value
+                continue
+            if c == '"':
+                self.in_string = True
+                self.string_start = i
+            elif c == '{':
+                self.depth += 1
+                if self.depth == 1:
+                    self.expect_key = True
+                elif self.depth == 3 and self.in_organisers:
+                    self.object_start = i
+            elif c == '}':
+                if self.depth == 3 and self.in_organisers:
+                    completed.append(json.loads(buf[self.object_start:i + 1]))
+                self.depth -= 1
+            elif c == '[':
+                self.depth += 1
+                if self.depth == 2 and self.current_key == "organisers":
+                    self.in_organisers = True
+            elif c == ']':
+                if self.depth == 2:
+                    self.in_organisers = False
+                self.depth -= 1
+            elif c == ',' and self.depth == 1:
+                self.expect_key = True
+        self.pos = len(buf)
+        return completed
+
 
 class LLMWrapper:
-    def __init__(self, api_url: str, api_key: str, referer: str = "", title: str = ""):
-        self.client = OpenAI(base_url=api_url, api_key=api_key)
+    def __init__(self, api_url: str, api_key: str, referer: str = "", title: str = "", chunk_size: int = 0, max_workers: int = 4, streaming: bool = False,
+                 model: str = "openai/gpt-4o", fast_model: str = "", fast_model_max_chars: int = 8000, fast_model_max_tracks: int = 2,
+                 timeout: float = 120.0, max_retries: int = 5, backoff_base: float = 1.0, backoff_max: float = 60.0):
+        # Retries are handled by create_completion, so that they can be counted and honour Retry-After
+        self.client = OpenAI(base_url=api_url, api_key=api_key, timeout=timeout, max_retries=0)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_stats = {"requests": 0, "retries": 0, "rate_limited": 0, "server_errors": 0, "timeouts": 0, "failures": 0}
+        self.stats_lock = threading.Lock()
         self.extra_headers = {
             "HTTP-Referer": referer,
             "X-Title": title
         }
-        self.model = "openai/gpt-4o"
+        self.model = model
+        # Short CfPs with few committees/tracks go to the fast model (empty disables tiering)
+        self.fast_model = fast_model
+        self.fast_model_max_chars = fast_model_max_chars
+        self.fast_model_max_tracks = fast_model_max_tracks
+        # CfPs longer than chunk_size characters are extracted in parallel chunks (0 disables chunking)
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        # Stream the completion and hand over each organiser as soon as it is generated
+        self.streaming = streaming
 
-    def prepare_prompt(self, cfp: CallForPaper) -> str:
+    def prepare_prompt(self, cfp: CallForPaper, part: int = None, parts: int = None) -> str:
+        part_note = ""
+        if part is not None and parts is not None and parts > 1:
+            part_note = f"""
+    The Call for Papers is too long to be processed at once, so you are receiving part {part} of {parts}. Parts after the first one start with the beginning of the document, followed by "[...]": use it only to identify the event details, and extract people and topics only from the text that follows it.
+"""
         text_prompt = f"""In this prompt, you will receive a Call for Papers of a scientific event. Your task is to parse it, and identify some crucial elements.
-
+{part_note}
     You must be exhaustive when extracting people. Extract **ALL** organisers, chairs, committee members, and track chairs listed in the text. Do not leave anyone out.
     
     For each person extracted:
@@ -36,11 +135,8 @@ class LLMWrapper:
                 </call_for_papers>"""
         return text_prompt
 
-    def run_model(self, cfp: CallForPaper) -> dict:
-        text_prompt = self.prepare_prompt(cfp)
-        
-        messages = [{"role": "user", "content": text_prompt}]
-        response_format = {
+    def get_response_format(self) -> dict:
+        return {
             "type": "json_schema",
             "json_schema": {
               "name": "organising_committe_of_conference",
@@ -112,15 +208,210 @@ class LLMWrapper:
               }
             }
         }
+
+    def select_model(self, cfp: CallForPaper) -> str:
+        """Pick the fast model for short CfPs with few committees or tracks, the main model otherwise."""
+        if not self.fast_model or len(cfp.text) > self.fast_model_max_chars:
+            return self.model
+        committee_sections = 0
+        for section in cfp.split_sections():
+            heading = section.strip().split('\n')[0]
+            if re.search(r'(committee|chairs?\b|track)', heading, re.IGNORECASE):
+                committee_sections += 1
+        if committee_sections > self.fast_model_max_tracks:
+            return self.model
+        return self.fast_model
+
+    def validate_result(self, result) -> None:
+        """Raise ValueError if the result does not follow the extraction schema."""
+        schema = self.get_response_format()["json_schema"]["schema"]
+        if not isinstance(result, dict):
+            raise ValueError("The model output is not a JSON object")
+        for key in schema["required"]:
+            if key not in result:
+                raise ValueError(f"Missing '{key}' in the model output")
+            expected = schema["properties"][key]["type"]
+            if expected == "string" and not isinstance(result[key], str):
+                raise ValueError(f"'{key}' is not a string")
+            if expected == "array" and not isinstance(result[key], list):
+                raise ValueError(f"'{key}' is not a list")
+        organiser_keys = schema["properties"]["organisers"]["items"]["required"]
+        for org in result["organisers"]:
+            if not isinstance(org, dict) or any(not isinstance(org.get(k), str) for k in organiser_keys):
+                raise ValueError("Malformed organiser in the model output")
+
+    def count(self, key: str) -> None:
+        with self.stats_lock:
+            self.retry_stats[key] += 1
+        record_llm(key)
+
+    def get_retry_after(self, error) -> float:
+        """Seconds to wait as requested by the server (Retry-After / retry-after-ms headers), if any."""
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        headers = response.headers
+        if headers.get("retry-after-ms"):
+            try:
+                return float(headers["retry-after-ms"]) / 1000
+            except ValueError:
+                pass
+        retry_after = headers.get("retry-after")
+        if not retry_after:
+            return None
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def create_completion(self, **kwargs):
+        """
+        Call chat.completions.create, retrying rate limits (429), server errors (5xx),
+        timeouts and connection errors with jittered exponential backoff.
+        """
+        attempt = 0
+        while True:
+            self.count("requests")
+            try:
+                return self.client.chat.completions.create(**kwargs)
+            except openai.RateLimitError as e:
+                self.count("rate_limited")
+                error = e
+            except openai.APIStatusError as e:
+                if e.status_code < 500:
+                    self.count("failures")
+                    raise
+                self.count("server_errors")
+                error = e
+            except openai.APIConnectionError as e:  # includes APITimeoutError
+                self.count("timeouts")
+                error = e
+            
+            if attempt >= self.max_retries:
+                self.count("failures")
+                raise error
+            
+            delay = self.backoff_base * (2 ** attempt)
+            delay = min(self.backoff_max, delay / 2 + random.uniform(0, delay / 2))
+            retry_after = self.get_retry_after(error)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            attempt += 1
+            self.count("retries")
+            print(f"LLM request failed ({type(error).__name__}). Retry {attempt}/{self.max_retries} in {delay:.1f}s...")
+            time.sleep(delay)
+
+    def extract(self, text_prompt: str, model: str = None) -> dict:
+        messages = [{"role": "user", "content": text_prompt}]
         
-        completion = self.client.chat.completions.create(
+        completion = self.create_completion(
             extra_headers=self.extra_headers, 
-            model=self.model, 
+            model=model or self.model, 
             messages=messages, 
-            response_format=response_format
+            response_format=self.get_response_format()
         )
         
-        result = json.loads(completion.choices[0].message.content)
+        return json.loads(completion.choices[0].message.content)
+
+    def extract_streaming(self, text_prompt: str, on_organiser, model: str = None) -> dict:
+        """
+        Same as `extract`, but the completion is streamed and `on_organiser(organiser, fields)`
+        is called for every organiser as soon as it is complete, together with the
+        top-level fields (event name, year, ...) generated so far.
+        """
+        messages = [{"role": "user", "content": text_prompt}]
+        
+        stream = self.create_completion(
+            extra_headers=self.extra_headers, 
+            model=model or self.model, 
+            messages=messages, 
+            response_format=self.get_response_format(),
+            stream=True
+        )
+        
+        parser = OrganiserStreamParser()
+        streamed_organisers = []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if not content:
+                continue
+            for organiser in parser.feed(content):
+                self.tag_organiser(organiser)
+                streamed_organisers.append(organiser)
+                on_organiser(organiser, parser.fields)
+        
+        result = json.loads(parser.buffer)
+        # Keep the very same objects that were handed over, so that enrichment done in the meantime is preserved
+        if len(result.get("organisers", [])) == len(streamed_organisers):
+            result["organisers"] = streamed_organisers
+        return result
+
+    def tag_organiser(self, organiser: dict) -> None:
+        organiser["affiliation_provenance"] = "LLM"
+        organiser["verified"] = False
+
+    def run_model_chunked(self, cfp: CallForPaper) -> dict:
+        """
+        Extract each chunk of a long CfP with a separate, concurrent LLM call and
+        merge the partial results. Event fields are taken from the first chunk
+        that provides them; organisers and topics are merged as in the storage layer.
+        """
+        chunks = cfp.split_chunks(self.chunk_size)
+        prompts = [
+            self.prepare_prompt(CallForPaper(chunk), part=i + 1, parts=len(chunks))
+            for i, chunk in enumerate(chunks)
+        ]
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(prompts)))) as executor:
+            partial_results = list(executor.map(self.extract, prompts))
+        
+        result = {
+            "event_name": "",
+            "event_acronym": "",
+            "conference_series": "",
+            "colocated_with": "",
+            "year": "",
+            "location": "",
+            "topics": [],
+            "organisers": []
+        }
+        for partial in partial_results:
+            for key in ["event_name", "event_acronym", "conference_series", "colocated_with", "year", "location"]:
+                if not result[key] and partial.get(key):
+                    result[key] = partial[key]
+            result["topics"] = merge_topics(result["topics"], partial.get("topics", []))
+            result["organisers"] = merge_organisers(result["organisers"], partial.get("organisers", []))
+            
+        return result
+
+    def run_single(self, cfp: CallForPaper, model: str, on_organiser=None) -> dict:
+        if self.streaming and on_organiser is not None:
+            return self.extract_streaming(self.prepare_prompt(cfp), on_organiser, model)
+        return self.extract(self.prepare_prompt(cfp), model)
+
+    def run_model(self, cfp: CallForPaper, on_organiser=None) -> dict:
+        """
+        Run the extraction. When `on_organiser` is given and streaming is enabled, it is called
+        for each organiser while the model is still generating (chunked extraction is not streamed).
+        """
+        if self.chunk_size and len(cfp.text) > self.chunk_size:
+            result = self.run_model_chunked(cfp)
+        else:
+            model = self.select_model(cfp)
+            try:
+                result = self.run_single(cfp, model, on_organiser)
+                self.validate_result(result)
+            except ValueError as e:  # json.JSONDecodeError is a ValueError too
+                if model == self.model:
+                    raise
+                print(f"The output of {model} is not valid ({e}). Falling back to {self.model}.")
+                result = self.run_single(cfp, self.model, on_organiser)
         
         # Post-processing
         tracks = set()
@@ -134,7 +425,8 @@ class LLMWrapper:
                     org["track_name"] = "Other"
                     
         for org in result.get("organisers", []):
-            org["affiliation_provenance"] = "LLM"
-            org["verified"] = False
+            # Streamed organisers were tagged on arrival and may already be enriched
+            if "affiliation_provenance" not in org:
+                self.tag_organiser(org)
             
         return result
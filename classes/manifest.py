@@ -0,0 +1,155 @@
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from .file_utils import atomic_write
+from .serialization import dumps, loads
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are only serialised within a process
+    fcntl = None
+
+MANIFEST_NAME = "manifest.jsonl"
+# Fields of the processed data that the manifest repeats as they are
+MANIFEST_FIELDS = ("event_name", "event_acronym", "conference_series", "year", "topics", "organisers")
+# Fields of each organiser kept in the manifest: what the Explore Organisers page aggregates
+ORGANISER_FIELDS = ("organiser_name", "organiser_affiliation", "organiser_country", "orcid", "openalex_page", "openalex_name", "affiliation_ror")
+
+def manifest_entry(stem: str, conf_dict: dict) -> dict:
+    """What the manifest keeps about a saved file: enough to list and search events without opening it."""
+    return {
+        "file": stem,
+        "event_name": conf_dict.get("event_name", ""),
+        "event_acronym": conf_dict.get("event_acronym", ""),
+        "conference_series": conf_dict.get("conference_series", ""),
+        "year": str(conf_dict.get("year", "")),
+        "organisers": [{field: org[field] for field in ORGANISER_FIELDS if org.get(field)}
+                       for org in conf_dict.get("organisers", []) if org.get("organiser_name", "").strip()],
+        "topics": conf_dict.get("topics", []),
+        "saved_at": time.time()
+    }
+
+
+def file_entry(path: Path) -> dict:
+    """Manifest entry of a saved file read from disk (saved at its modification time), or None if it cannot be read."""
+    try:
+        data = loads(path.read_bytes())
+        saved_at = path.stat().st_mtime
+    except (OSError, ValueError):
+        return None
+    entry = manifest_entry(path.stem, data.get("processed", data))
+    entry["saved_at"] = saved_at
+    return entry
+
+
+class Manifest:
+    """
+    Index of the files saved by StorageToFile: an append-only JSON lines file in the destination
+    folder with one entry per save (the last entry of a file wins). It is read incrementally (only
+    the lines appended since the last read) and compacted once most of its lines are outdated.
+    Writers of several processes are serialised with a lock file.
+    """
+    def __init__(self, folder: str, compact_ratio: int = 2, compact_min_lines: int = 100):
+        self.folder = Path(folder)
+        self.path = self.folder / MANIFEST_NAME
+        self.lock_path = self.folder / f".{MANIFEST_NAME}.lock"
+        self.compact_ratio = compact_ratio
+        self.compact_min_lines = compact_min_lines
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.lines = 0
+        self.offset = 0
+        self.inode = None
+
+    @contextmanager
+    def file_lock(self, exclusive: bool = True):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def refresh(self) -> None:
+        """Read the lines appended since the last call (everything again if the manifest was compacted meanwhile)."""
+        if not self.path.is_file():
+            if any(self.folder.glob("*.json")):
+                # Folder saved before the manifest existed
+                self.rebuild()
+            return
+        stat = self.path.stat()
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self.entries, self.lines, self.offset, self.inode = {}, 0, 0, stat.st_ino
+        if stat.st_size == self.offset:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+        # A line still being appended is picked up by the next refresh
+        complete = data[:data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            if line.strip():
+                entry = loads(line)
+                self.entries[entry["file"]] = entry
+                self.lines += 1
+        self.offset += len(complete)
+
+    def update(self, stem: str, conf_dict: dict) -> None:
+        line = dumps(manifest_entry(stem, conf_dict)) + b"\n"
+        self.folder.mkdir(parents=True, exist_ok=True)
+        with self.lock, self.file_lock():
+            self.refresh()
+            with open(self.path, 'ab') as f:
+                f.write(line)
+            self.refresh()
+            if self.lines > self.compact_min_lines and self.lines > self.compact_ratio * len(self.entries):
+                self.write(self.entries)
+
+    def write(self, entries: dict) -> None:
+        """Replace the manifest with one line per file (the caller holds the locks)."""
+        atomic_write(self.path, b"".join(dumps(entry) + b"\n" for entry in entries.values()))
+        self.entries = entries
+        self.lines = len(entries)
+        stat = self.path.stat()
+        self.offset, self.inode = stat.st_size, stat.st_ino
+
+    def rebuild(self) -> None:
+        """Recreate the manifest by reading every saved file."""
+        entries = {}
+        for path in sorted(self.folder.glob("*.json")):
+            entry = file_entry(path)
+            if entry is not None:
+                entries[path.stem] = entry
+        self.write(entries)
+
+    def reconcile(self) -> None:
+        """
+        Follow the files of the folder: index the ones saved without StorageToFile.save (e.g. by
+        test_script.py) and forget deleted ones. Only new files are read, and the files whose entry
+        was written by older versions (organiser keys instead of organisers), once per process.
+        """
+        paths = {path.stem: path for path in self.folder.glob("*.json")}
+        for stem in [stem for stem in self.entries if stem not in paths]:
+            del self.entries[stem]
+        outdated = [stem for stem, entry in self.entries.items() if any(isinstance(org, str) for org in entry.get("organisers", []))]
+        for stem in list(paths.keys() - self.entries.keys()) + outdated:
+            entry = file_entry(paths[stem])
+            if entry is not None:
+                if stem in self.entries:
+                    entry["saved_at"] = self.entries[stem]["saved_at"]
+                self.entries[stem] = entry
+
+    def list(self) -> list:
+        """Entries of all saved files, most recently saved first."""
+        if not self.folder.is_dir():
+            # Nothing has been saved yet (the lock file cannot be created either)
+            return []
+        with self.lock, self.file_lock(exclusive=False):
+            self.refresh()
+            self.reconcile()
+            entries = list(self.entries.values())
+        return sorted(entries, key=lambda entry: entry["saved_at"], reverse=True)
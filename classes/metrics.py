@@ -0,0 +1,156 @@
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import pymongo.monitoring
+
+# Prometheus metrics of the running process (None until enable() is called)
+metrics = None
+lock = threading.Lock()
+# Metrics servers started by start_from_config, by port
+servers = {}
+
+# Seconds; from sub-millisecond FAISS searches to multi-minute LLM extractions
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+class Metrics:
+    """
+    Counters and latency histograms exposed to Prometheus (requires prometheus_client).
+    Stage latencies come from the StageTimer records, so every timed stage (LLM, each OpenAlex
+    request type, spaCy, encoding, FAISS, venue matching, save) gets its own histogram series.
+    """
+    def __init__(self):
+        import prometheus_client
+
+        self.stage_seconds = prometheus_client.Histogram(
+            "coci_stage_seconds", "Duration of the processing stages", ["stage", "status"], buckets=LATENCY_BUCKETS)
+        self.documents = prometheus_client.Counter(
+            "coci_documents", "Processed calls for papers", ["status"])
+        self.llm_requests = prometheus_client.Counter(
+            "coci_llm_requests", "Requests to the model API and their retries and failures", ["outcome"])
+        self.cache_lookups = prometheus_client.Counter(
+            "coci_cache_lookups", "Lookups of cached results (stored events, LLM outputs, ledger stages)", ["cache", "result"])
+        self.mongo_seconds = prometheus_client.Histogram(
+            "coci_mongo_command_seconds", "Duration of MongoDB commands", ["command", "status"], buckets=LATENCY_BUCKETS)
+
+def enable() -> bool:
+    """
+    Create the metrics of this process (once) and start collecting MongoDB command timings.
+    Returns False if prometheus_client is not installed.
+    """
+    global metrics
+    with lock:
+        if metrics is not None:
+            return True
+        try:
+            metrics = Metrics()
+        except ImportError:
+            print("Metrics are disabled: the 'prometheus_client' library is not installed (pip install prometheus_client).")
+            return False
+        # Applies to the MongoDB clients created from now on
+        pymongo.monitoring.register(MongoCommandListener())
+        if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            # The model caches live in this process only, so they cannot be collected in multiprocess mode
+            import prometheus_client
+            prometheus_client.REGISTRY.register(ModelCacheCollector())
+        return True
+
+def use_multiprocess_dir() -> str:
+    """
+    Folder through which worker processes share their samples (set before prometheus_client is
+    imported). A PROMETHEUS_MULTIPROC_DIR set by the user is reused; otherwise a temporary folder
+    is created and removed when the process exits.
+    """
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        os.makedirs(path, exist_ok=True)
+        return path
+    path = tempfile.mkdtemp(prefix="coci-metrics-")
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+def start_server(port: int, addr: str = "0.0.0.0", multiprocess: bool = False) -> bool:
+    """
+    Enable the metrics and serve them on http://addr:port/metrics from a background thread.
+    With `multiprocess`, the samples of worker processes started afterwards are served too.
+    """
+    if multiprocess:
+        use_multiprocess_dir()
+    if not enable():
+        return False
+    import prometheus_client
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Worker processes write their samples to this folder; the server aggregates them
+        from prometheus_client.multiprocess import MultiProcessCollector
+        registry = prometheus_client.CollectorRegistry()
+        MultiProcessCollector(registry)
+        prometheus_client.start_http_server(port, addr=addr, registry=registry)
+    else:
+        prometheus_client.start_http_server(port, addr=addr)
+    print(f"Serving metrics on http://{addr}:{port}/metrics")
+    return True
+
+def start_from_config(config) -> bool:
+    """Start the metrics server configured in the [METRICS] section (port = 0 disables it), once per process."""
+    port = config.getint('METRICS', 'port', fallback=0)
+    if port <= 0:
+        return False
+    with lock:
+        if port in servers:
+            return servers[port]
+        servers[port] = False
+    try:
+        servers[port] = start_server(port, config.get('METRICS', 'addr', fallback="0.0.0.0"))
+    except OSError as e:
+        print(f"Could not start the metrics server on port {port}: {e}")
+    return servers[port]
+
+def record_stage(record: dict) -> None:
+    if metrics is not None:
+        status = "failed" if record.get("error") else "ok"
+        metrics.stage_seconds.labels(record["stage"], status).observe(record["seconds"])
+
+def record_document(status: str) -> None:
+    if metrics is not None:
+        metrics.documents.labels(status).inc()
+
+def record_llm(outcome: str) -> None:
+    if metrics is not None:
+        metrics.llm_requests.labels(outcome).inc()
+
+def record_cache(cache: str, hit: bool) -> None:
+    if metrics is not None:
+        metrics.cache_lookups.labels(cache, "hit" if hit else "miss").inc()
+
+
+class MongoCommandListener(pymongo.monitoring.CommandListener):
+    """pymongo command listener feeding the MongoDB latency histogram."""
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        record_mongo(event.command_name, event.duration_micros, "ok")
+
+    def failed(self, event):
+        record_mongo(event.command_name, event.duration_micros, "failed")
+
+def record_mongo(command: str, duration_micros: int, status: str) -> None:
+    if metrics is not None:
+        metrics.mongo_seconds.labels(command, status).observe(duration_micros / 1e6)
+
+
+class ModelCacheCollector:
+    """Hits and misses of the in-process caches of the embedding model, topics and venue datasets."""
+    def collect(self):
+        from prometheus_client.core import CounterMetricFamily
+        from .topics import load_embedding_model, load_openalex_topics
+        from .conference import load_venue_dataset
+
+        family = CounterMetricFamily("coci_model_cache_lookups", "Lookups of the models and FAISS indexes loaded once per process", labels=["cache", "result"])
+        for name, func in [("embedding_model", load_embedding_model), ("openalex_topics", load_openalex_topics), ("venue_datasets", load_venue_dataset)]:
+            info = func.cache_info()
+            family.add_metric([name, "hit"], info.hits)
+            family.add_metric([name, "miss"], info.misses)
+        yield family
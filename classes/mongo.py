@@ -0,0 +1,34 @@
+import configparser
+import os
+import threading
+import pymongo
+
+# Shared clients, by process, URI and options (see get_mongo_client)
+clients = {}
+lock = threading.Lock()
+
+def mongo_options(config: configparser.ConfigParser) -> dict:
+    """Connection pool sizes and timeouts of the [MONGODB] section, as MongoClient keyword arguments."""
+    socket_timeout = config.getint('MONGODB', 'socket_timeout_ms', fallback=0)
+    return {
+        "maxPoolSize": config.getint('MONGODB', 'max_pool_size', fallback=100),
+        "minPoolSize": config.getint('MONGODB', 'min_pool_size', fallback=0),
+        "serverSelectionTimeoutMS": config.getint('MONGODB', 'server_selection_timeout_ms', fallback=5000),
+        "connectTimeoutMS": config.getint('MONGODB', 'connect_timeout_ms', fallback=5000),
+        # 0: no timeout
+        "socketTimeoutMS": socket_timeout or None
+    }
+
+def get_mongo_client(uri: str, **options) -> pymongo.MongoClient:
+    """
+    The MongoClient of this process for a URI and options, created on first use. A client is
+    thread-safe and keeps its own connection pool, so every storage object and page of a process
+    shares it instead of paying the connection setup and server selection again. The process id
+    is part of the key because a client must not be used after a fork.
+    """
+    key = (os.getpid(), uri, tuple(sorted(options.items())))
+    with lock:
+        client = clients.get(key)
+        if client is None:
+            client = clients[key] = pymongo.MongoClient(uri, **options)
+    return client
@@ -1,33 +1,140 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from .call_for_paper import CallForPaper
 from .llm_wrapper import LLMWrapper
 from .openalex_wrapper import OpenAlexWrapper
 from .organisers import Organisers
 from .topics import Topics
 from .conference import Conference
+from .timing import StageTimer, timed
+from .metrics import record_cache
 
 class Orchestrator:
-    def __init__(self, api_url: str, api_key: str, referer: str = "", title: str = "", openalex_api= ""):
-        self.llm_wrapper = LLMWrapper(api_url, api_key, referer, title)
+    def __init__(self, api_url: str, api_key: str, referer: str = "", title: str = "", openalex_api= "", llm_options: dict = None, openalex_workers: int = 4, timing_log: str = ""):
+        self.llm_wrapper = LLMWrapper(api_url, api_key, referer, title, **(llm_options or {}))
         self.openalex_wrapper = OpenAlexWrapper(debug=False, openalex_api=openalex_api)
+        # Concurrent OpenAlex lookups when organisers are enriched while the model is streaming
+        self.openalex_workers = openalex_workers
+        # JSON lines file receiving the stage timings of every processed CfP (empty: in memory only)
+        self.timing_log = timing_log
 
-    def process(self, cfp_text: str, progress_callback=None, cached_llm_result=None) -> Conference:
-        def log(msg):
-            print(msg)
-            if progress_callback:
-                progress_callback(msg)
+    @classmethod
+    def from_config(cls, config):
+        """Build an orchestrator from a parsed config.ini (configparser.ConfigParser)."""
+        llm_options = {
+            "chunk_size": config.getint('LLM', 'chunk_size', fallback=0),
+            "max_workers": config.getint('LLM', 'max_workers', fallback=4),
+            "streaming": config.getboolean('LLM', 'streaming', fallback=False),
+            "model": config.get('DEFAULT', 'model', fallback="openai/gpt-4o"),
+            "fast_model": config.get('LLM', 'fast_model', fallback=""),
+            "fast_model_max_chars": config.getint('LLM', 'fast_model_max_chars', fallback=8000),
+            "fast_model_max_tracks": config.getint('LLM', 'fast_model_max_tracks', fallback=2),
+            "timeout": config.getfloat('LLM', 'timeout', fallback=120.0),
+            "max_retries": config.getint('LLM', 'max_retries', fallback=5),
+            "backoff_base": config.getfloat('LLM', 'backoff_base', fallback=1.0),
+            "backoff_max": config.getfloat('LLM', 'backoff_max', fallback=60.0)
+        }
+        return cls(
+            config['DEFAULT']['api_url'],
+            config['DEFAULT']['api_key'],
+            config.get('TEAM', 'website', fallback=""),
+            config.get('TEAM', 'description', fallback=""),
+            config.get('OPENALEX', 'openalex_api', fallback=""),
+            llm_options=llm_options,
+            openalex_workers=config.getint('OPENALEX', 'max_workers', fallback=4),
+            timing_log=config.get('METRICS', 'timing_log', fallback="")
+        )
+
+    def run_model_streaming(self, cfp: CallForPaper, log, timer: StageTimer = None) -> tuple:
+        """
+        Run the model in streaming mode, enriching each organiser via OpenAlex as soon as
+        it is generated. Returns the LLM result and whether the organisers were enriched.
+        """
+        executor = ThreadPoolExecutor(max_workers=max(1, self.openalex_workers))
+        pending = {}
+        # Organisers handed over while streaming, with the affiliation generated by the model
+        streamed = {}
+
+        def report(future):
+            future.result()
+            organiser = pending.pop(future)
+            log(f"Enriched {organiser.get('organiser_name', '')} via OpenAlex.")
+
+        def on_organiser(organiser, fields):
+            name = organiser.get("organiser_name", "")
+            streamed[id(organiser)] = (organiser, organiser.get("organiser_affiliation", ""))
+            year_int = self.openalex_wrapper.parse_year(fields.get("year"))
+            future = executor.submit(self.openalex_wrapper.enrich_organiser, organiser, year_int, timer)
+            pending[future] = organiser
+            log(f"Extracted {name}: enriching via OpenAlex...")
+            for done in [f for f in pending if f.done()]:
+                report(done)
+
+        try:
+            llm_result = self.llm_wrapper.run_model(cfp, on_organiser=on_organiser)
+            log("Finished running model.")
+            for future in as_completed(list(pending)):
+                report(future)
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+        # If the extraction was repeated without streaming (e.g. model fallback), the returned organisers were not enriched
+        organisers_list = llm_result.get("organisers", [])
+        enriched = len(organisers_list) > 0 and all(id(org) in streamed for org in organisers_list)
+        llm_affiliations = [streamed[id(org)][1] for org in organisers_list] if enriched else []
+        if enriched and self.openalex_wrapper.needs_affiliation_cleanup(llm_affiliations):
+            # The affiliation check needs the whole list: redo the lookups without the default-looking affiliations
+            log("Affiliations look like default values. Processing organisers via OpenAlex again without them...")
+            self.openalex_wrapper.clear_affiliations(organisers_list)
+            self.openalex_wrapper.enrich_organisers(organisers_list, llm_result.get("year", ""), timer)
+        return llm_result, enriched
+
+    def run_llm(self, cfp_text: str, log=print, cached_llm_result=None, checkpoint=None, timer: StageTimer = None) -> tuple:
+        """
+        LLM stage. Returns the LLM result and whether its organisers were already enriched (streaming).
+        With a checkpoint (see JobLedger), a previously saved stage output is reused and a new one is saved.
+        """
+        if checkpoint is not None and not cached_llm_result:
+            saved = checkpoint.get("llm-output")
+            record_cache("ledger", saved is not None)
+            if saved is not None:
+                log("Resuming from the saved LLM results...")
+                return saved, checkpoint.get("organisers") is not None
 
         cfp = CallForPaper(cfp_text)
-        cfp.clean()
+        with timed(timer, "clean"):
+            report = cfp.clean()
+        if not cached_llm_result and report["tokens_saved"] > 0:
+            saved_pct = 100 * report["tokens_saved"] / max(report["original_tokens"], 1)
+            log(f"Cleaned call for papers: removed {len(report['removed_sections'])} sections, ~{report['tokens_saved']} tokens saved ({saved_pct:.0f}%).")
 
         if cached_llm_result:
+            record_cache("llm_output", True)
             log("Using cached LLM results (Mild Force)...")
-            llm_result = cached_llm_result
+            return cached_llm_result, False
+
+        log("Connected to remote model. Running model...")
+        if self.llm_wrapper.chunk_size and len(cfp.text) > self.llm_wrapper.chunk_size:
+            parts = len(cfp.split_chunks(self.llm_wrapper.chunk_size))
+            log(f"Long call for papers: extracting {parts} parts in parallel...")
+        if self.llm_wrapper.streaming:
+            with timed(timer, "llm", streaming=True):
+                llm_result, organisers_enriched = self.run_model_streaming(cfp, log, timer)
         else:
-            log("Connected to remote model. Running model...")
-            llm_result = self.llm_wrapper.run_model(cfp)
+            with timed(timer, "llm"):
+                llm_result = self.llm_wrapper.run_model(cfp)
+            organisers_enriched = False
             log("Finished running model.")
+        if checkpoint is not None:
+            checkpoint.put("llm-output", llm_result)
+            if organisers_enriched:
+                checkpoint.put("organisers", llm_result.get("organisers", []))
+        return llm_result, organisers_enriched
 
-        conf = Conference(
+    def build_conference(self, llm_result: dict) -> Conference:
+        return Conference(
             name=llm_result.get("event_name", ""),
             acronym=llm_result.get("event_acronym", ""),
             series=llm_result.get("conference_series", ""),
@@ -36,20 +143,105 @@ class Orchestrator:
             location=llm_result.get("location", "")
         )
 
+    def enrich_organisers(self, conf: Conference, llm_result: dict, log=print, already_enriched: bool = False, checkpoint=None, timer: StageTimer = None) -> None:
+        """OpenAlex stage (network-bound)."""
+        saved = checkpoint.get("organisers") if checkpoint is not None else None
+        if checkpoint is not None:
+            record_cache("ledger", saved is not None)
+        if saved is not None:
+            log("Resuming from the saved OpenAlex organisers...")
+            conf.set_organisers(Organisers(saved))
+            return
         organisers = Organisers(llm_result.get("organisers", []))
-        log("Processing organisers via OpenAlex...")
-        organisers.enrich_with_openalex(self.openalex_wrapper, conf.year)
+        if not already_enriched:
+            log("Processing organisers via OpenAlex...")
+            with timed(timer, "organisers", count=len(organisers.to_dict())):
+                organisers.enrich_with_openalex(self.openalex_wrapper, conf.year, timer)
         conf.set_organisers(organisers)
+        if checkpoint is not None:
+            checkpoint.put("organisers", organisers.to_dict())
         log("Completed processing organisers via OpenAlex.")
 
+    def map_topics(self, conf: Conference, llm_result: dict, log=print, checkpoint=None, timer: StageTimer = None) -> None:
+        """Topic mapping stage (local CPU: spaCy, embeddings, FAISS)."""
+        saved = checkpoint.get("topics") if checkpoint is not None else None
+        if checkpoint is not None:
+            record_cache("ledger", saved is not None)
+        if saved is not None:
+            log("Resuming from the saved topic mapping...")
+            topics = Topics(saved["topics"], saved.get("preferred_threshold", 0.60))
+            topics.enhanced_topics = saved.get("enhanced_topics", {})
+            conf.set_topics(topics)
+            return
         topics = Topics(llm_result.get("topics", []))
         log("Mapping the topics of interest to OpenAlex Topics...")
-        topics.match_openalex_topics()
+        with timed(timer, "topics", count=len(topics.topics_list)):
+            topics.match_openalex_topics(timer=timer)
         conf.set_topics(topics)
         log("Mapped the topics of interest to OpenAlex Topics.")
+        if checkpoint is not None:
+            checkpoint.put("topics", topics.to_dict())
 
+    def match_venues(self, conf: Conference, log=print, checkpoint=None, timer: StageTimer = None) -> None:
+        """Venue matching stage (local CPU: embeddings, FAISS)."""
+        saved = checkpoint.get("venues") if checkpoint is not None else None
+        if checkpoint is not None:
+            record_cache("ledger", saved is not None)
+        if saved is not None:
+            log("Resuming from the saved dataset matches...")
+            conf.dblp, conf.aida, conf.confident = saved["DBLP"], saved["AIDA"], saved["ConfIDent"]
+            return
         log("Mapping the conference to other datasets...")
-        conf.match_conference_with_other_datasets()
+        with timed(timer, "venues"):
+            conf.match_conference_with_other_datasets(timer=timer)
         log("Mapped the conference to other datasets.")
+        if checkpoint is not None:
+            checkpoint.put("venues", {"DBLP": conf.dblp, "AIDA": conf.aida, "ConfIDent": conf.confident})
+
+    def process(self, cfp_text: str, progress_callback=None, cached_llm_result=None, checkpoint=None, timer: StageTimer = None) -> Conference:
+        """
+        Run all the stages on a CfP. The stage timings are recorded on `timer` (a new StageTimer
+        if none is given), which is returned as `conf.timer` so that callers can time the save too.
+        """
+        if timer is None:
+            timer = StageTimer(log_path=self.timing_log)
+        start = time.monotonic()
+        caller = threading.current_thread()
+        pending_messages = queue.Queue()
+
+        def log(msg):
+            print(msg)
+            if progress_callback:
+                if threading.current_thread() is caller:
+                    progress_callback(msg)
+                else:
+                    # UI callbacks (e.g. Streamlit elements) can only be used from the calling thread
+                    pending_messages.put(msg)
+
+        def flush_messages():
+            while not pending_messages.empty():
+                progress_callback(pending_messages.get())
+
+        llm_result, organisers_enriched = self.run_llm(cfp_text, log, cached_llm_result, checkpoint, timer)
+        conf = self.build_conference(llm_result)
+        conf.timer = timer
+
+        # The OpenAlex enrichment is network-bound, while topic and venue matching only need the
+        # LLM result and run on the local CPU: run them concurrently and join before returning.
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(self.enrich_organisers, conf, llm_result, log, organisers_enriched, checkpoint, timer),
+                executor.submit(self.map_topics, conf, llm_result, log, checkpoint, timer),
+                executor.submit(self.match_venues, conf, log, checkpoint, timer)
+            ]
+            while not all(future.done() for future in futures):
+                wait(futures, timeout=0.2)
+                if progress_callback:
+                    flush_messages()
+        if progress_callback:
+            flush_messages()
+        for future in futures:
+            future.result()
+        timer.add("process", time.monotonic() - start)
 
         return conf, llm_result
@@ -0,0 +1,125 @@
+import queue
+import threading
+import time
+from .orchestrator import Orchestrator
+from .timing import StageTimer
+
+# Marks the end of the input of a stage
+STOP = None
+
+class Pipeline:
+    """
+    Staged processing of many CfPs. Every stage (LLM, OpenAlex, topics, venues, save) has its own
+    worker threads and they are connected by bounded queues, so that while one document is being
+    enriched via OpenAlex the next one is already with the LLM and the previous one is being
+    mapped to topics. Each document goes through the same steps as Orchestrator.process.
+    """
+    def __init__(self, orchestrator: Orchestrator, storage, llm_workers: int = 4, openalex_workers: int = 4,
+                 topic_workers: int = 1, venue_workers: int = 1, save_workers: int = 1, queue_size: int = 8):
+        self.orchestrator = orchestrator
+        self.storage = storage
+        self.queue_size = queue_size
+        self.stages = [
+            ("llm", self.run_llm, llm_workers),
+            ("organisers", self.enrich_organisers, openalex_workers),
+            ("topics", self.map_topics, topic_workers),
+            ("venues", self.match_venues, venue_workers),
+            ("save", self.save, save_workers)
+        ]
+
+    def run_llm(self, job: dict) -> None:
+        job["llm_result"], job["organisers_enriched"] = self.orchestrator.run_llm(
+            job["cfp_text"], self.make_log(job), job.get("cached_llm_result"), job.get("checkpoint"), job["timer"])
+        job["conf"] = self.orchestrator.build_conference(job["llm_result"])
+        job["conf"].timer = job["timer"]
+
+    def enrich_organisers(self, job: dict) -> None:
+        self.orchestrator.enrich_organisers(job["conf"], job["llm_result"], self.make_log(job), job["organisers_enriched"], job.get("checkpoint"), job["timer"])
+
+    def map_topics(self, job: dict) -> None:
+        self.orchestrator.map_topics(job["conf"], job["llm_result"], self.make_log(job), job.get("checkpoint"), job["timer"])
+
+    def match_venues(self, job: dict) -> None:
+        self.orchestrator.match_venues(job["conf"], self.make_log(job), job.get("checkpoint"), job["timer"])
+
+    def save(self, job: dict) -> None:
+        with job["timer"].stage("save"):
+            self.storage.save(job["filename"], job["conf"].to_dict(), job["llm_result"], job["cfp_text"])
+
+    def make_log(self, job: dict):
+        def log(msg):
+            print(f"[{job['filename']}] {msg}")
+        return log
+
+    def stage_worker(self, name: str, func, in_queue: queue.Queue, out_queue: queue.Queue) -> None:
+        while True:
+            job = in_queue.get()
+            if job is STOP:
+                return
+            if job.get("error") is None:
+                start = time.monotonic()
+                try:
+                    func(job)
+                except Exception as e:
+                    job["error"] = f"{name}: {type(e).__name__}: {e}"
+                job["stage_seconds"][name] = time.monotonic() - start
+            out_queue.put(job)
+
+    def run(self, jobs, on_done=None) -> list:
+        """
+        Process an iterable of jobs (dicts with "filename", "cfp_text" and optionally "cached_llm_result"
+        and a ledger "checkpoint").
+        `on_done(job)` is called as each job leaves the pipeline. Failed jobs carry an "error";
+        every job carries the StageTimer of its stages in "timer". If iterating `jobs` raises, the
+        jobs already fed are finished and the exception is then raised here.
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        done_queue = queue.Queue()
+        stage_threads = []
+        for position, (name, func, workers) in enumerate(self.stages):
+            out_queue = queues[position + 1] if position + 1 < len(queues) else done_queue
+            threads = [
+                threading.Thread(target=self.stage_worker, args=(name, func, queues[position], out_queue),
+                                 name=f"pipeline-{name}-{i}", daemon=True)
+                for i in range(max(1, workers))
+            ]
+            for thread in threads:
+                thread.start()
+            stage_threads.append(threads)
+
+        feed_errors = []
+        def feed():
+            try:
+                for job in jobs:
+                    job.setdefault("error", None)
+                    job["stage_seconds"] = {}
+                    job["timer"] = StageTimer(job["filename"], self.orchestrator.timing_log)
+                    job["start"] = time.monotonic()
+                    queues[0].put(job)
+            except Exception as e:
+                feed_errors.append(e)
+            finally:
+                # Stop each stage once the previous one has drained
+                for position, threads in enumerate(stage_threads):
+                    for _ in threads:
+                        queues[position].put(STOP)
+                    for thread in threads:
+                        thread.join()
+                done_queue.put(STOP)
+
+        feeder = threading.Thread(target=feed, name="pipeline-feeder", daemon=True)
+        feeder.start()
+
+        results = []
+        while True:
+            job = done_queue.get()
+            if job is STOP:
+                break
+            job["seconds"] = time.monotonic() - job["start"]
+            results.append(job)
+            if on_done:
+                on_done(job)
+        feeder.join()
+        if feed_errors:
+            raise feed_errors[0]
+        return results
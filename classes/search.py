@@ -0,0 +1,129 @@
+from rapidfuzz import fuzz
+
+def search_events(events: list, query: str, threshold: int = 60) -> list:
+    """
+    Fuzzy search of event records (documents of the events collection, with the "processed" fields)
+    by name, acronym, series and topics, sorted by similarity and then by index (newest first).
+    """
+    query = query.lower()
+    matched = []
+    for doc in events:
+        processed = doc.get("processed", {})
+        name = processed.get("event_name", "")
+        acronym = processed.get("event_acronym", "")
+        series = processed.get("conference_series", "")
+        year = processed.get("year", "")
+        topics = processed.get("topics", [])
+        idx = doc.get("index") or doc.get("_id")
+
+        # Check fuzzy similarities
+        name_score = fuzz.WRatio(query, name.lower())
+        acronym_score = fuzz.WRatio(query, acronym.lower())
+        series_score = fuzz.WRatio(query, series.lower())
+
+        # Check topics similarities
+        topic_score = 0
+        best_topic = ""
+        for t in topics:
+            t_score = fuzz.WRatio(query, t.lower())
+            if t_score > topic_score:
+                topic_score = t_score
+                best_topic = t
+
+        max_score = max(name_score, acronym_score, series_score, topic_score)
+
+        if max_score >= threshold:
+            match_reason = ""
+            if max_score == topic_score and topic_score > 70:
+                match_reason = f"Matched topic: *'{best_topic}'*"
+
+            matched.append({
+                "index": idx,
+                "event_name": name,
+                "event_acronym": acronym,
+                "conference_series": series,
+                "year": year,
+                "similarity": max_score,
+                "match_reason": match_reason
+            })
+
+    # Sort by similarity score descending, and then by Index ID descending
+    matched.sort(key=lambda x: (x.get("similarity", 0), x.get("index", 0)), reverse=True)
+    return matched
+
+def organiser_key(org: dict) -> str:
+    """Unique key of an organiser: ORCID, OpenAlex page or lowercase name."""
+    name = org.get("organiser_name", "").strip()
+    return org.get("orcid", "") or org.get("openalex_page", "") or name.lower()
+
+def aggregate_organisers(events: list) -> list:
+    """Unique organisers across event records, keyed by ORCID, OpenAlex page or lowercase name, with the events they organised."""
+    organisers_map = {}
+    for doc in events:
+        processed = doc.get("processed", {})
+        event_info = {
+            "index": doc.get("index") or doc.get("_id"),
+            "event_name": processed.get("event_name", ""),
+            "event_acronym": processed.get("event_acronym", ""),
+            "conference_series": processed.get("conference_series", ""),
+            "year": processed.get("year", "")
+        }
+        if "saved_at" in doc:
+            event_info["saved_at"] = doc["saved_at"]
+
+        for org in processed.get("organisers", []):
+            name = org.get("organiser_name", "").strip()
+            if not name:
+                continue
+
+            orcid = org.get("orcid", "")
+            openalex = org.get("openalex_page", "")
+            key = organiser_key(org)
+
+            if key not in organisers_map:
+                organisers_map[key] = {
+                    "key": key,
+                    "name": name,
+                    "openalex_name": org.get("openalex_name", ""),
+                    "affiliation": org.get("organiser_affiliation", ""),
+                    "orcid": orcid,
+                    "openalex_page": openalex,
+                    "affiliation_ror": org.get("affiliation_ror", ""),
+                    "country": org.get("organiser_country", ""),
+                    "events": [event_info]
+                }
+            else:
+                entry = organisers_map[key]
+                # Avoid duplicates in organised events list
+                if not any(e["index"] == event_info["index"] for e in entry["events"]):
+                    entry["events"].append(event_info)
+
+                # Merge profile details if they were previously missing
+                for field in ["openalex_name", "affiliation", "orcid", "openalex_page", "affiliation_ror", "country"]:
+                    if not entry.get(field) and org.get(field):
+                        entry[field] = org.get(field)
+
+    return list(organisers_map.values())
+
+def search_organisers(organisers: list, query: str, threshold: int = 60) -> list:
+    """Fuzzy search of aggregated organisers by name, OpenAlex name and affiliation, sorted by similarity and then by name."""
+    query = query.lower()
+    matched = []
+    for org in organisers:
+        name = org.get("name", "")
+        oa_name = org.get("openalex_name", "")
+        aff = org.get("affiliation", "")
+
+        # Check fuzzy matches
+        name_score = fuzz.WRatio(query, name.lower())
+        oa_name_score = fuzz.WRatio(query, oa_name.lower()) if oa_name else 0
+        aff_score = fuzz.WRatio(query, aff.lower()) if aff else 0
+
+        max_score = max(name_score, oa_name_score, aff_score)
+        if max_score >= threshold:
+            org["similarity"] = max_score
+            matched.append(org)
+
+    # Sort by similarity score descending, and then by Name ascending
+    matched.sort(key=lambda x: (x.get("similarity", 0), x.get("name", "").lower()), reverse=True)
+    return matched
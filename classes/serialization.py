@@ -0,0 +1,26 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps(data, pretty: bool = False) -> bytes:
+    """
+    Serialise to UTF-8 JSON bytes: compact by default, indented by 2 spaces with `pretty`.
+    Uses orjson when it is installed, and the standard library otherwise (or for values orjson rejects).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+        except TypeError:
+            pass
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode("utf-8")
+
+def loads(data):
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,16 +1,131 @@
-import json
 import configparser
+import copy
+import hashlib
+import os
+import threading
+from abc import ABC, abstractmethod
 from pathlib import Path
 import pymongo
+from pymongo import InsertOne, UpdateOne
+from .file_utils import atomic_write
+from .manifest import MANIFEST_FIELDS, Manifest
+from .search import search_events
+from .serialization import dumps, loads
+from .compression import compress_text, decompress_text
+from .mongo import get_mongo_client, mongo_options
 
-class StorageToFile:
-    def __init__(self, dest_folder: str):
+class StorageBackend(ABC):
+    """
+    Interface of the storage backends. Besides saving and loading single files, backends list the
+    saved events as records shaped like the documents of the MongoDB events collection ("_id",
+    "index", "filenames", "processed" and "llm-output"; with the file storage every file is an
+    event whose index is its stem). Projections are lists of dotted field paths, such as
+    ["processed.event_name", "processed.year"]; "_id" is always returned.
+    """
+    @abstractmethod
+    def is_processed(self, filename: str) -> bool:
+        """Check if the conference file has already been processed."""
+
+    @abstractmethod
+    def load(self, filename: str) -> dict:
+        """The "llm-output", "processed" and "cfp_text" of a saved file (FileNotFoundError if there is none)."""
+
+    @abstractmethod
+    def save(self, filename: str, conf_dict: dict, llm_output: dict, cfp_text: str = None) -> None:
+        """Save both the raw LLM output and the fully processed conference data."""
+
+    @abstractmethod
+    def update_preferred_threshold(self, filename: str, threshold: float) -> None:
+        """Change the topic similarity threshold of a saved file."""
+
+    @abstractmethod
+    def iter_events(self, projection: list = None):
+        """Every saved event, in no particular order."""
+
+    @abstractmethod
+    def page_events(self, after=None, limit: int = 20, projection: list = None) -> tuple:
+        """
+        One page of events, most recently added first: the events after the cursor `after` (None for
+        the first page) and the cursor of the next page (None after the last one).
+        """
+
+    @abstractmethod
+    def get_event(self, index) -> dict:
+        """The event with this index, or None."""
+
+    @abstractmethod
+    def event_cfp_text(self, event: dict, filename: str) -> str:
+        """CfP text of one of the files of an event ("" if it was not saved)."""
+
+    def exists_many(self, filenames: list) -> dict:
+        """is_processed of many files, as {filename: bool}."""
+        return {filename: self.is_processed(filename) for filename in filenames}
+
+    def load_many(self, filenames: list) -> dict:
+        """load of many files, as {filename: data}; files that are not saved are left out."""
+        loaded = {}
+        for filename in filenames:
+            try:
+                loaded[filename] = self.load(filename)
+            except FileNotFoundError:
+                continue
+        return loaded
+
+    def save_many(self, saves: list) -> None:
+        """Save many files, given as (filename, conf_dict, llm_output, cfp_text) tuples, in order."""
+        for save in saves:
+            self.save(*save)
+
+
+def project(record: dict, projection: list) -> dict:
+    """Copy of an event record with only the fields of a projection (and "_id")."""
+    if projection is None:
+        return record
+    projected = {"_id": record.get("_id")}
+    for path in projection:
+        keys = path.split(".")
+        value = record
+        for key in keys:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = projected
+            for key in keys[:-1]:
+                target = target.setdefault(key, {})
+            target[keys[-1]] = value
+    return projected
+
+def mongo_projection(projection: list) -> dict:
+    return {path: 1 for path in projection} if projection is not None else None
+
+
+class StorageToFile(StorageBackend):
+    def __init__(self, dest_folder: str, pretty: bool = False, compression: str = "zlib"):
         self.dest_folder = dest_folder
+        # Indented JSON files (easier to read, larger and slower to write)
+        self.pretty = pretty
+        # How CfP texts are compressed: "zstd", "zlib" or "none"
+        self.compression = compression
+        self.manifest = Manifest(dest_folder)
 
     def _get_path(self, filename: str) -> Path:
         cut_filename = Path(filename).stem
         return Path(self.dest_folder) / f"{cut_filename}.json"
 
+    def _get_cfp_path(self, filename: str) -> Path:
+        """The (compressed) CfP text is kept in a sidecar file, so that saving results never has to read it back."""
+        cut_filename = Path(filename).stem
+        return Path(self.dest_folder) / f"{cut_filename}.cfp"
+
+    def _find_cfp_path(self, filename: str) -> Path:
+        """The sidecar file of the CfP text, including uncompressed ones (<stem>.cfp.txt), if there is one."""
+        cfp_path = self._get_cfp_path(filename)
+        if cfp_path.is_file():
+            return cfp_path
+        legacy_path = cfp_path.with_name(f"{cfp_path.name}.txt")
+        return legacy_path if legacy_path.is_file() else None
+
     def is_processed(self, filename: str) -> bool:
         """Check if the conference file has already been processed."""
         return self._get_path(filename).is_file()
@@ -19,48 +134,130 @@ class StorageToFile:
         """Save both the raw LLM output and the fully processed conference data, preserving/saving cfp_text."""
         path = self._get_path(filename)
         
-        existing_cfp = None
-        if path.is_file():
+        if cfp_text is not None:
+            self.write_cfp_text(filename, cfp_text)
+        elif path.is_file() and self._find_cfp_path(filename) is None:
+            # Older files keep the CfP text inline: move it to the sidecar file once
             try:
-                with open(path, 'r') as f:
-                    old_data = json.load(f)
-                existing_cfp = old_data.get("cfp_text")
+                existing_cfp = loads(path.read_bytes()).get("cfp_text")
+                if existing_cfp is not None:
+                    self.write_cfp_text(filename, existing_cfp)
             except Exception:
                 pass
         
-        final_cfp = cfp_text if cfp_text is not None else existing_cfp
-        
         data = {
             "llm-output": llm_output,
             "processed": conf_dict
         }
-        if final_cfp is not None:
-            data["cfp_text"] = final_cfp
-            
-        with open(path, 'w') as f:
-            json.dump(data, f, indent=4)
+        atomic_write(path, dumps(data, self.pretty))
+        self.manifest.update(path.stem, conf_dict)
+
+    def update_preferred_threshold(self, filename: str, threshold: float) -> None:
+        """Change the topic similarity threshold of a saved file (the CfP text is not read nor rewritten)."""
+        path = self._get_path(filename)
+        data = loads(path.read_bytes())
+        processed = data["processed"] if "processed" in data else data
+        processed["preferred_threshold"] = threshold
+        atomic_write(path, dumps(data, self.pretty))
+
+    def list_events(self) -> list:
+        """Name, acronym, series, year, organiser keys and topics of every saved file (from the manifest), most recent first."""
+        return self.manifest.list()
+
+    def search_events(self, query: str, threshold: int = 60) -> list:
+        """Fuzzy search of the saved events, as on the Explore Events page (the index is the file stem)."""
+        events = [{"_id": entry["file"], "processed": entry} for entry in self.list_events()]
+        return search_events(events, query, threshold)
+
+    def exists_many(self, filenames: list) -> dict:
+        saved = {path.stem for path in Path(self.dest_folder).glob("*.json")}
+        return {filename: Path(filename).stem in saved for filename in filenames}
+
+    def get_event(self, index) -> dict:
+        path = Path(self.dest_folder) / f"{index}.json"
+        if not path.is_file():
+            return None
+        data = loads(path.read_bytes())
+        if "processed" not in data and "event_name" in data:
+            data = {"llm-output": data, "processed": data}
+        return {
+            "_id": path.stem,
+            "index": path.stem,
+            "filenames": [path.stem],
+            "llm-output": data.get("llm-output", {}),
+            "processed": data.get("processed", {})
+        }
+
+    def event_cfp_text(self, event: dict, filename: str) -> str:
+        try:
+            return self.load(filename).get("cfp_text", "")
+        except FileNotFoundError:
+            return ""
+
+    def records(self, entries: list, projection: list = None):
+        """Event records of manifest entries: from the manifest alone when it has every projected field."""
+        from_manifest = projection is not None and all(
+            path in ("_id", "index", "filenames", "saved_at") or (path.startswith("processed.") and path[len("processed."):] in MANIFEST_FIELDS)
+            for path in projection
+        )
+        for entry in entries:
+            if from_manifest:
+                stem = entry["file"]
+                event = {"_id": stem, "index": stem, "filenames": [stem], "processed": {field: entry.get(field) for field in MANIFEST_FIELDS}}
+            else:
+                event = self.get_event(entry["file"])
+                if event is None:
+                    continue
+            # The index of a file is its stem, so records also carry when it was saved
+            event["saved_at"] = entry["saved_at"]
+            yield project(event, projection)
+
+    def iter_events(self, projection: list = None):
+        return self.records(self.list_events(), projection)
+
+    def page_events(self, after=None, limit: int = 20, projection: list = None) -> tuple:
+        # (saved_at, file) orders the files totally, so a cursor stays valid while files are saved
+        entries = sorted(self.list_events(), key=lambda entry: (entry["saved_at"], entry["file"]), reverse=True)
+        if after is not None:
+            entries = [entry for entry in entries if (entry["saved_at"], entry["file"]) < tuple(after)]
+        page = entries[:limit]
+        cursor = (page[-1]["saved_at"], page[-1]["file"]) if len(entries) > limit else None
+        return list(self.records(page, projection)), cursor
+
+    def write_cfp_text(self, filename: str, cfp_text: str) -> None:
+        cfp_path = self._get_cfp_path(filename)
+        atomic_write(cfp_path, compress_text(cfp_text, self.compression))
+        legacy_path = cfp_path.with_name(f"{cfp_path.name}.txt")
+        if legacy_path.is_file():
+            legacy_path.unlink()
+
+    def load_cfp_text(self, filename: str, data: dict) -> str:
+        cfp_path = self._find_cfp_path(filename)
+        if cfp_path is not None:
+            return decompress_text(cfp_path.read_bytes())
+        return data.get("cfp_text", "")
 
     def load(self, filename: str) -> dict:
         """
         Load the saved data. Provides backward compatibility for older JSON
-        files that didn't have the "llm-output" and "processed" keys.
+        files that didn't have the "llm-output" and "processed" keys, or that
+        kept the CfP text inline.
         """
         path = self._get_path(filename)
-        with open(path, 'r') as f:
-            data = json.load(f)
+        data = loads(path.read_bytes())
         
         # Backward compatibility for old JSON schema
         if "processed" not in data and "event_name" in data:
             return {
                 "llm-output": data,
                 "processed": data,
-                "cfp_text": data.get("cfp_text", "")
+                "cfp_text": self.load_cfp_text(filename, data)
             }
             
         return {
             "llm-output": data.get("llm-output", {}),
             "processed": data.get("processed", {}),
-            "cfp_text": data.get("cfp_text", "")
+            "cfp_text": self.load_cfp_text(filename, data)
         }
 
 
@@ -181,14 +378,74 @@ def merge_event_data(existing_data: dict, new_data: dict) -> dict:
     return merged
 
 
-class StorageToMongo:
-    def __init__(self, uri: str, db_name: str):
+def event_key(conf_dict: dict, llm_output: dict) -> tuple:
+    """Event name, conference series and year under which a file is saved (events with the same name and year are merged)."""
+    event_name = conf_dict.get("event_name") or llm_output.get("event_name", "")
+    conference_series = conf_dict.get("conference_series") or llm_output.get("conference_series", "")
+    year = conf_dict.get("year") or llm_output.get("year", "")
+    return str(event_name).strip(), str(conference_series).strip(), str(year).strip()
+
+def changed_fields(prefix: str, old: dict, new: dict) -> dict:
+    """$set operations for the top-level fields of `new` that differ from `old`."""
+    return {f"{prefix}.{key}": value for key, value in new.items() if key not in old or old[key] != value}
+
+def cfp_hash(cfp_text: str) -> str:
+    """Key of a CfP text in the cfp_texts collection."""
+    return hashlib.sha256(cfp_text.encode("utf-8")).hexdigest()
+
+def load_event_cfp_text(db, event_doc: dict, filename: str) -> str:
+    """
+    CfP text of a file of an event document (of the first file if it is not one of the event's), read
+    from the cfp_texts collection, or from the inline cfps array of documents saved before it existed.
+    """
+    filenames = event_doc.get("filenames", [])
+    stem = Path(filename).stem
+    pos = filenames.index(stem) if stem in filenames else 0
+
+    if "cfp_refs" in event_doc:
+        refs = event_doc["cfp_refs"]
+        ref = refs[pos] if pos < len(refs) else ""
+        cfp_doc = db["cfp_texts"].find_one({"_id": ref}) if ref else None
+        return decompress_text(cfp_doc["text"]) if cfp_doc else ""
+
+    cfps = event_doc.get("cfps", [])
+    if isinstance(cfps, dict):
+        cfp_text = cfps.get(stem, "")
+        if not cfp_text and cfps:
+            cfp_text = next(iter(cfps.values()))
+        return cfp_text
+    if isinstance(cfps, list) and pos < len(cfps):
+        return decompress_text(cfps[pos]) or ""
+    return ""
+
+
+class StorageToMongo(StorageBackend):
+    def __init__(self, uri: str, db_name: str, compression: str = "zlib", index_block_size: int = 1, client_options: dict = None):
         self.uri = uri
         self.db_name = db_name
-        self.client = pymongo.MongoClient(uri)
+        # How CfP texts are compressed in the cfp_texts collection: "zstd", "zlib" or "none"
+        self.compression = compression
+        # Shared by all the storage objects of the process with the same URI and options
+        self.client = get_mongo_client(uri, **(client_options or {}))
         self.db = self.client[db_name]
         self.events = self.db["events"]
         self.events_index = self.db["events_index"]
+        # CfP texts, stored once per distinct text and referenced by the events (cfp_refs)
+        self.cfp_texts = self.db["cfp_texts"]
+        # Atomic counter of the progressive event index
+        self.counters = self.db["counters"]
+        # Indexes reserved at a time (> 1 saves a round trip per new event, leaving gaps in the
+        # numbering when a process exits before using its whole block)
+        self.index_block_size = max(1, index_block_size)
+        self.index_lock = threading.Lock()
+        self.index_block = []
+        self.counter_seeded = False
+
+    def compress_cfp(self, cfp_text: str):
+        """Value stored in the cfp_texts collection: compressed bytes, or "" when there is no text."""
+        if cfp_text is None:
+            return ""
+        return compress_text(cfp_text, self.compression) if self.compression != "none" else cfp_text
 
     def is_processed(self, filename: str) -> bool:
         """Check if the conference file has already been processed."""
@@ -202,37 +459,61 @@ class StorageToMongo:
         if not doc:
             raise FileNotFoundError(f"No database record found for filename {filename}")
         
-        filenames = doc.get("filenames", [])
-        cfps = doc.get("cfps", [])
-        
-        cfp_text = ""
-        try:
-            idx = filenames.index(stem)
-            if idx < len(cfps):
-                cfp_text = cfps[idx]
-        except ValueError:
-            if cfps:
-                cfp_text = cfps[0]
-        
         # Construct standard dict with "llm-output", "processed" and "cfp_text"
         return {
             "llm-output": doc.get("llm-output", {}),
             "processed": doc.get("processed", {}),
-            "cfp_text": cfp_text
+            "cfp_text": load_event_cfp_text(self.db, doc, stem)
         }
 
+    def store_cfp(self, cfp_text: str) -> str:
+        """
+        Store a CfP text in the cfp_texts collection, keyed by the SHA-256 of the text, and return
+        the key ("" when there is no text). Identical texts are stored once.
+        """
+        if not cfp_text:
+            return ""
+        ref = cfp_hash(cfp_text)
+        self.cfp_texts.update_one(
+            {"_id": ref},
+            {"$setOnInsert": {"text": self.compress_cfp(cfp_text), "length": len(cfp_text)}},
+            upsert=True
+        )
+        return ref
+
+    def cfp_refs_of(self, event_doc: dict) -> list:
+        """
+        References of the CfP texts of an event, parallel to its filenames. Texts of documents saved
+        before the cfp_texts collection existed (inline cfps array) are moved to the collection.
+        """
+        filenames = event_doc.get("filenames", [])
+        if "cfp_refs" in event_doc:
+            refs = list(event_doc["cfp_refs"])
+        else:
+            cfps = event_doc.get("cfps", [])
+            if isinstance(cfps, dict):
+                # Migration fallback if old structure was a dict
+                cfps = [cfps.get(f, "") for f in filenames]
+            elif not isinstance(cfps, list):
+                cfps = []
+            refs = [self.store_cfp(decompress_text(cfp)) for cfp in cfps]
+        while len(refs) < len(filenames):
+            refs.append("")
+        return refs
+
     def save(self, filename: str, conf_dict: dict, llm_output: dict, cfp_text: str = None) -> None:
-        """Save both the raw LLM output and the fully processed conference data to MongoDB."""
+        """
+        Save both the raw LLM output and the fully processed conference data to MongoDB. A new event is
+        created with a single upsert; a file of an existing event is merged into it with one update
+        that only sets the fields the merge changed and pushes the new filename and CfP reference.
+        """
         stem = Path(filename).stem
         
         # Extract event name, conference series, and year
-        event_name = conf_dict.get("event_name") or llm_output.get("event_name", "")
-        conference_series = conf_dict.get("conference_series") or llm_output.get("conference_series", "")
-        year = conf_dict.get("year") or llm_output.get("year", "")
+        event_name_str, conference_series_str, year_str = event_key(conf_dict, llm_output)
         
-        event_name_str = str(event_name).strip()
-        conference_series_str = str(conference_series).strip()
-        year_str = str(year).strip()
+        # The text is stored before the event references it
+        cfp_ref = self.store_cfp(cfp_text) if cfp_text is not None else None
         
         # Quick lookup in events_index (Table 2)
         existing_idx_doc = self.events_index.find_one({
@@ -249,85 +530,325 @@ class StorageToMongo:
                     {"_id": existing_idx_doc["_id"]},
                     {"$set": {"conference_series": conference_series_str}}
                 )
+        else:
+            # Generate new progressive index
+            idx = self.next_index()
             
-            # Retrieve from events (Table 1)
-            existing_event = self.events.find_one({"_id": idx})
-            
-            if existing_event:
-                # Merge the information
-                merged_processed = merge_event_data(existing_event.get("processed", {}), conf_dict)
-                merged_llm_output = merge_event_data(existing_event.get("llm-output", {}), llm_output)
-                filenames = existing_event.get("filenames", [])
-                
-                # Fetch existing CFPs list and ensure length aligns
-                cfps = existing_event.get("cfps", [])
-                if not isinstance(cfps, list):
-                    # Migration fallback if old structure was a dict
-                    cfps = [cfps.get(f, "") for f in filenames] if isinstance(cfps, dict) else []
-                
-                while len(cfps) < len(filenames):
-                    cfps.append("")
-                
-                if stem not in filenames:
-                    filenames.append(stem)
-                    cfps.append(cfp_text if cfp_text is not None else "")
-                else:
-                    stem_idx = filenames.index(stem)
-                    if cfp_text is not None:
-                        cfps[stem_idx] = cfp_text
-                
-                self.events.replace_one(
-                    {"_id": idx},
-                    {
-                        "_id": idx,
-                        "index": idx,
-                        "filenames": filenames,
-                        "cfps": cfps,
-                        "llm-output": merged_llm_output,
-                        "processed": merged_processed
-                    }
-                )
-            else:
-                # Fallback if events_index doc exists but events doc is missing
-                cfps = [cfp_text if cfp_text is not None else ""]
-                self.events.insert_one({
-                    "_id": idx,
+            # Insert into events_index
+            try:
+                self.events_index.insert_one({
+                    "index": idx,
+                    "event_name": event_name_str,
+                    "conference_series": conference_series_str,
+                    "year": year_str
+                })
+            except pymongo.errors.DuplicateKeyError:
+                # Another worker has just created the same event: merge into it (the allocated index is left unused)
+                existing_idx_doc = self.events_index.find_one({
+                    "event_name": event_name_str,
+                    "year": year_str
+                })
+                if existing_idx_doc is None:
+                    raise
+                idx = existing_idx_doc["index"]
+        
+        # Retrieve from events (Table 1)
+        existing_event = self.events.find_one({"_id": idx})
+        
+        if existing_event is None:
+            # New event (or events_index doc without its events doc): a single upsert, which leaves
+            # the document alone if a concurrent save has just created it
+            result = self.events.update_one(
+                {"_id": idx},
+                {"$setOnInsert": {
                     "index": idx,
                     "filenames": [stem],
-                    "cfps": cfps,
+                    "cfp_refs": [cfp_ref or ""],
                     "llm-output": llm_output,
                     "processed": conf_dict
-                })
+                }},
+                upsert=True
+            )
+            if result.upserted_id is not None:
+                return
+            existing_event = self.events.find_one({"_id": idx})
+        
+        update = self.merge_update(existing_event, stem, conf_dict, llm_output, cfp_ref)
+        if not update:
+            return
+        
+        query = {"_id": idx}
+        if "$push" in update:
+            # Keeps filenames and cfp_refs aligned if the same file is being added concurrently
+            query["filenames"] = {"$ne": stem}
+        result = self.events.update_one(query, update)
+        if result.matched_count == 0:
+            self.save(filename, conf_dict, llm_output, cfp_text)
+
+    def seed_counter(self) -> None:
+        """Start the counter from the highest index in use (databases created before the counter existed)."""
+        max_doc = self.events_index.find_one(sort=[("index", -1)])
+        if max_doc:
+            # $max is idempotent, so concurrent workers seeding at the same time agree
+            self.counters.update_one({"_id": "events"}, {"$max": {"value": max_doc["index"]}}, upsert=True)
+        self.counter_seeded = True
+
+    def next_index(self) -> int:
+        """
+        Allocate a new progressive event index with an atomic $inc on the counters collection, so that
+        concurrent workers never get the same index. Indexes are reserved index_block_size at a time.
+        """
+        with self.index_lock:
+            if not self.index_block:
+                if not self.counter_seeded:
+                    self.seed_counter()
+                counter = self.counters.find_one_and_update(
+                    {"_id": "events"},
+                    {"$inc": {"value": self.index_block_size}},
+                    upsert=True,
+                    return_document=pymongo.ReturnDocument.AFTER
+                )
+                last = counter["value"]
+                self.index_block = list(range(last - self.index_block_size + 1, last + 1))
+            return self.index_block.pop(0)
+
+    def merge_update(self, existing_event: dict, stem: str, conf_dict: dict, llm_output: dict, cfp_ref: str = None) -> dict:
+        """Update operators merging a file into an existing event ({} when nothing changes)."""
+        # The merge functions modify nested organisers and topic matches in place
+        old_processed = existing_event.get("processed", {})
+        old_llm_output = existing_event.get("llm-output", {})
+        merged_processed = merge_event_data(copy.deepcopy(old_processed), conf_dict)
+        merged_llm_output = merge_event_data(copy.deepcopy(old_llm_output), llm_output)
+        
+        to_set = changed_fields("processed", old_processed, merged_processed)
+        to_set.update(changed_fields("llm-output", old_llm_output, merged_llm_output))
+        update = {}
+        
+        filenames = existing_event.get("filenames", [])
+        refs = existing_event.get("cfp_refs")
+        if refs is None or len(refs) != len(filenames):
+            # Inline texts of older documents (or misaligned references): rewrite both arrays
+            refs = self.cfp_refs_of(existing_event)
+            filenames = list(filenames)
+            if stem not in filenames:
+                filenames.append(stem)
+                refs.append(cfp_ref or "")
+            elif cfp_ref is not None:
+                refs[filenames.index(stem)] = cfp_ref
+            to_set["filenames"] = filenames
+            to_set["cfp_refs"] = refs
+            if "cfps" in existing_event:
+                update["$unset"] = {"cfps": ""}
+        elif stem not in filenames:
+            update["$push"] = {"filenames": stem, "cfp_refs": cfp_ref or ""}
+        elif cfp_ref is not None and refs[filenames.index(stem)] != cfp_ref:
+            to_set[f"cfp_refs.{filenames.index(stem)}"] = cfp_ref
+        
+        if to_set:
+            update["$set"] = to_set
+        return update
+
+    def update_preferred_threshold(self, filename: str, threshold: float) -> None:
+        """Change the topic similarity threshold of a saved event without rewriting it."""
+        stem = Path(filename).stem
+        self.events.update_one({"filenames": stem}, {"$set": {"processed.preferred_threshold": threshold}})
+
+    def exists_many(self, filenames: list) -> dict:
+        stems = list({Path(filename).stem for filename in filenames})
+        saved = set()
+        for doc in self.events.find({"filenames": {"$in": stems}}, {"filenames": 1}):
+            saved.update(doc.get("filenames", []))
+        return {filename: Path(filename).stem in saved for filename in filenames}
+
+    def load_many(self, filenames: list) -> dict:
+        """One query for the events and one for their CfP texts."""
+        stems = {Path(filename).stem for filename in filenames}
+        by_stem = {}
+        for doc in self.events.find({"filenames": {"$in": list(stems)}}):
+            for stem in doc.get("filenames", []):
+                if stem in stems:
+                    by_stem[stem] = doc
+        refs = {}
+        for stem, doc in by_stem.items():
+            if "cfp_refs" in doc:
+                pos = doc["filenames"].index(stem)
+                refs[stem] = doc["cfp_refs"][pos] if pos < len(doc["cfp_refs"]) else ""
+        wanted = list({ref for ref in refs.values() if ref})
+        texts = {cfp_doc["_id"]: decompress_text(cfp_doc["text"]) for cfp_doc in self.cfp_texts.find({"_id": {"$in": wanted}})} if wanted else {}
+
+        loaded = {}
+        for filename in filenames:
+            stem = Path(filename).stem
+            doc = by_stem.get(stem)
+            if doc is None:
+                continue
+            loaded[filename] = {
+                "llm-output": doc.get("llm-output", {}),
+                "processed": doc.get("processed", {}),
+                # Documents with the texts inline (cfps) are read as load does
+                "cfp_text": texts.get(refs[stem], "") if stem in refs else load_event_cfp_text(self.db, doc, stem)
+            }
+        return loaded
+
+    def iter_events(self, projection: list = None):
+        return self.events.find({}, mongo_projection(projection))
+
+    def page_events(self, after=None, limit: int = 20, projection: list = None) -> tuple:
+        query = {"_id": {"$lt": after}} if after is not None else {}
+        page = list(self.events.find(query, mongo_projection(projection), sort=[("_id", -1)], limit=limit + 1))
+        cursor = page[limit - 1]["_id"] if len(page) > limit else None
+        return page[:limit], cursor
+
+    def get_event(self, index) -> dict:
+        return self.events.find_one({"_id": index})
+
+    def event_cfp_text(self, event: dict, filename: str) -> str:
+        return load_event_cfp_text(self.db, event, filename)
+
+    def save_many(self, saves: list) -> None:
+        """
+        Save many files with one unordered bulk_write per collection (plus one query each for the
+        existing index and event documents). Files of the same event, earlier in the list or already
+        in the database, are merged as save would; writes that lose a race with another worker are
+        redone with save.
+        """
+        if not saves:
+            return
+
+        # Files grouped by event, in save order
+        groups = {}
+        for filename, conf_dict, llm_output, cfp_text in saves:
+            event_name, series, year = event_key(conf_dict, llm_output)
+            group = groups.setdefault((event_name, year), {"series": "", "saves": []})
+            group["series"] = group["series"] or series
+            ref = (cfp_hash(cfp_text) if cfp_text else "") if cfp_text is not None else None
+            group["saves"].append((filename, conf_dict, llm_output, cfp_text, ref))
+
+        # 1. CfP texts (before the events reference them)
+        cfp_ops = {}
+        for group in groups.values():
+            for _, _, _, cfp_text, ref in group["saves"]:
+                if ref and ref not in cfp_ops:
+                    cfp_ops[ref] = UpdateOne(
+                        {"_id": ref},
+                        {"$setOnInsert": {"text": self.compress_cfp(cfp_text), "length": len(cfp_text)}},
+                        upsert=True
+                    )
+        if cfp_ops:
+            self.cfp_texts.bulk_write(list(cfp_ops.values()), ordered=False)
+
+        # 2. events_index: one query for all events, one bulk write for the new ones
+        index_docs = {
+            (doc["event_name"], doc["year"]): doc
+            for doc in self.events_index.find({"$or": [{"event_name": name, "year": year} for name, year in groups]})
+        }
+        index_ops = []
+        new_keys = []
+        for key, group in groups.items():
+            doc = index_docs.get(key)
+            if doc is None:
+                doc = {"index": self.next_index(), "event_name": key[0], "conference_series": group["series"], "year": key[1]}
+                index_docs[key] = doc
+                index_ops.append(InsertOne(doc))
+                new_keys.append(key)
+            elif not doc.get("conference_series") and group["series"]:
+                index_ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"conference_series": group["series"]}}))
+                new_keys.append(None)
+        if index_ops:
+            try:
+                self.events_index.bulk_write(index_ops, ordered=False)
+            except pymongo.errors.BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if any(error.get("code") != 11000 for error in errors):
+                    raise
+                # Events created meanwhile by another worker: merge into them
+                for error in errors:
+                    name, year = new_keys[error["index"]]
+                    index_docs[(name, year)] = self.events_index.find_one({"event_name": name, "year": year})
+
+        # 3. events: one query for the existing documents, one bulk write of all the merges
+        idxs = {key: index_docs[key]["index"] for key in groups}
+        existing = {doc["_id"]: doc for doc in self.events.find({"_id": {"$in": list(idxs.values())}})}
+        ops = []
+        inserts = []
+        for key, group in groups.items():
+            event = existing.get(idxs[key])
+            op = self.bulk_event_update(idxs[key], event, group["saves"])
+            if op is None:
+                continue
+            if event is None:
+                inserts.append(len(ops))
+            ops.append(op)
+        if not ops:
+            return
+        result = self.events.bulk_write(ops, ordered=False)
+
+        # Writes that found the document changed by another worker are redone one by one
+        lost_inserts = [pos for pos in inserts if pos not in result.upserted_ids]
+        updates_matched = result.matched_count - len(lost_inserts)
+        if lost_inserts or updates_matched < len(ops) - len(inserts):
+            saved = {doc["_id"]: set(doc.get("filenames", [])) for doc in self.events.find({"_id": {"$in": list(idxs.values())}}, {"filenames": 1})}
+            for key, group in groups.items():
+                if any(Path(save[0]).stem not in saved.get(idxs[key], set()) for save in group["saves"]):
+                    for filename, conf_dict, llm_output, cfp_text, _ in group["saves"]:
+                        self.save(filename, conf_dict, llm_output, cfp_text)
+
+    def bulk_event_update(self, idx: int, event: dict, saves: list):
+        """Bulk operation merging the buffered files of an event into its document (None if nothing changes)."""
+        doc = copy.deepcopy(event)
+        for filename, conf_dict, llm_output, _, ref in saves:
+            stem = Path(filename).stem
+            if doc is None:
+                doc = {"_id": idx, "index": idx, "filenames": [stem], "cfp_refs": [ref or ""],
+                       "llm-output": copy.deepcopy(llm_output), "processed": copy.deepcopy(conf_dict)}
+                continue
+            doc["processed"] = merge_event_data(doc.get("processed", {}), conf_dict)
+            doc["llm-output"] = merge_event_data(doc.get("llm-output", {}), llm_output)
+            if "cfp_refs" not in doc or len(doc["cfp_refs"]) != len(doc.get("filenames", [])):
+                doc["cfp_refs"] = self.cfp_refs_of(doc)
+            filenames = doc.setdefault("filenames", [])
+            if stem not in filenames:
+                filenames.append(stem)
+                doc["cfp_refs"].append(ref or "")
+            elif ref is not None:
+                doc["cfp_refs"][filenames.index(stem)] = ref
+
+        if event is None:
+            # A single upsert, which leaves the document alone if another worker has just created it
+            return UpdateOne({"_id": idx}, {"$setOnInsert": {k: v for k, v in doc.items() if k != "_id"}}, upsert=True)
+
+        to_set = changed_fields("processed", event.get("processed", {}), doc["processed"])
+        to_set.update(changed_fields("llm-output", event.get("llm-output", {}), doc["llm-output"]))
+        update = {}
+        query = {"_id": idx}
+        old_filenames = event.get("filenames", [])
+        old_refs = event.get("cfp_refs")
+        new_stems = doc["filenames"][len(old_filenames):]
+        slots_changed = old_refs is not None and old_refs != doc["cfp_refs"][:len(old_refs)]
+        if old_refs is None or len(old_refs) != len(old_filenames) or (new_stems and slots_changed):
+            # Both arrays are rewritten, provided no other worker has added a file meanwhile
+            to_set["filenames"] = doc["filenames"]
+            to_set["cfp_refs"] = doc["cfp_refs"]
+            query["filenames"] = old_filenames
+            if "cfps" in event:
+                update["$unset"] = {"cfps": ""}
+        elif new_stems:
+            update["$push"] = {"filenames": {"$each": new_stems}, "cfp_refs": {"$each": doc["cfp_refs"][len(old_filenames):]}}
+            query["filenames"] = {"$nin": new_stems}
         else:
-            # Generate new progressive index
-            max_doc = self.events_index.find_one(sort=[("index", -1)])
-            new_idx = (max_doc["index"] + 1) if max_doc else 1
-            
-            # Insert into events_index
-            self.events_index.insert_one({
-                "index": new_idx,
-                "event_name": event_name_str,
-                "conference_series": conference_series_str,
-                "year": year_str
-            })
-            
-            cfps = [cfp_text if cfp_text is not None else ""]
-            
-            # Insert into events
-            self.events.insert_one({
-                "_id": new_idx,
-                "index": new_idx,
-                "filenames": [stem],
-                "cfps": cfps,
-                "llm-output": llm_output,
-                "processed": conf_dict
-            })
-
-
-class StorageToBoth:
-    def __init__(self, dest_folder: str, uri: str, db_name: str):
-        self.file_storage = StorageToFile(dest_folder)
-        self.mongo_storage = StorageToMongo(uri, db_name)
+            for i, (old_ref, new_ref) in enumerate(zip(old_refs, doc["cfp_refs"])):
+                if old_ref != new_ref:
+                    to_set[f"cfp_refs.{i}"] = new_ref
+
+        if to_set:
+            update["$set"] = to_set
+        return UpdateOne(query, update) if update else None
+
+
+class StorageToBoth(StorageBackend):
+    def __init__(self, dest_folder: str, uri: str, db_name: str, pretty: bool = False, compression: str = "zlib", index_block_size: int = 1, client_options: dict = None):
+        self.file_storage = StorageToFile(dest_folder, pretty, compression)
+        self.mongo_storage = StorageToMongo(uri, db_name, compression, index_block_size, client_options)
 
     def is_processed(self, filename: str) -> bool:
         """Check if the conference file has already been processed in either file storage or MongoDB."""
@@ -345,6 +866,45 @@ class StorageToBoth:
         self.file_storage.save(filename, conf_dict, llm_output, cfp_text)
         self.mongo_storage.save(filename, conf_dict, llm_output, cfp_text)
 
+    def update_preferred_threshold(self, filename: str, threshold: float) -> None:
+        """Change the topic similarity threshold of a saved event in both file storage and MongoDB."""
+        if self.file_storage.is_processed(filename):
+            self.file_storage.update_preferred_threshold(filename, threshold)
+        self.mongo_storage.update_preferred_threshold(filename, threshold)
+
+    def exists_many(self, filenames: list) -> dict:
+        exists = self.file_storage.exists_many(filenames)
+        missing = [filename for filename, saved in exists.items() if not saved]
+        if missing:
+            exists.update(self.mongo_storage.exists_many(missing))
+        return exists
+
+    def load_many(self, filenames: list) -> dict:
+        """Prefers file storage, falls back to MongoDB."""
+        loaded = self.file_storage.load_many(filenames)
+        missing = [filename for filename in filenames if filename not in loaded]
+        if missing:
+            loaded.update(self.mongo_storage.load_many(missing))
+        return loaded
+
+    def save_many(self, saves: list) -> None:
+        self.file_storage.save_many(saves)
+        self.mongo_storage.save_many(saves)
+
+    # Events are listed from MongoDB, where the files of the same event are merged
+
+    def iter_events(self, projection: list = None):
+        return self.mongo_storage.iter_events(projection)
+
+    def page_events(self, after=None, limit: int = 20, projection: list = None) -> tuple:
+        return self.mongo_storage.page_events(after, limit, projection)
+
+    def get_event(self, index) -> dict:
+        return self.mongo_storage.get_event(index)
+
+    def event_cfp_text(self, event: dict, filename: str) -> str:
+        return self.mongo_storage.event_cfp_text(event, filename)
+
 
 # Aliases as requested
 storage_to_file = StorageToFile
@@ -352,21 +912,41 @@ storage_to_mongo = StorageToMongo
 storage_to_both = StorageToBoth
 
 
+# config.ini as last parsed by read_config, with its modification time
+config_cache = {}
+
+def read_config(path: str = 'config.ini') -> configparser.ConfigParser:
+    """The configuration file, parsed again only when it has changed."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    cached = config_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        config = configparser.ConfigParser()
+        config.read(path)
+        cached = config_cache[path] = (mtime, config)
+    return cached[1]
+
+
 class ConferenceStorage:
     def __new__(cls, dest_folder: str):
-        config = configparser.ConfigParser()
-        config.read('config.ini')
+        config = read_config()
         storage_type = config.get('STORAGE', 'type', fallback='file')
         # Clean inline comments and whitespace
         storage_type = storage_type.split('#')[0].split(';')[0].strip()
         
         uri = config.get('MONGODB', 'uri', fallback='mongodb://localhost:27017/')
         db_name = config.get('MONGODB', 'db_name', fallback='coci')
+        pretty = config.getboolean('STORAGE', 'pretty_json', fallback=False)
+        compression = config.get('STORAGE', 'cfp_compression', fallback='zlib').strip()
+        index_block_size = config.getint('MONGODB', 'index_block_size', fallback=1)
+        client_options = mongo_options(config)
         
         if storage_type == 'mongodb':
-            return StorageToMongo(uri, db_name)
+            return StorageToMongo(uri, db_name, compression, index_block_size, client_options)
         elif storage_type == 'both':
-            return StorageToBoth(dest_folder, uri, db_name)
+            return StorageToBoth(dest_folder, uri, db_name, pretty, compression, index_block_size, client_options)
         else:
-            return StorageToFile(dest_folder)
+            return StorageToFile(dest_folder, pretty, compression)
 
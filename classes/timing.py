@@ -0,0 +1,75 @@
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from .metrics import record_stage
+
+# Serialises appends to the JSON lines file across the timers of a process
+write_lock = threading.Lock()
+
+class StageTimer:
+    """
+    Wall-clock durations (monotonic clock) of the processing stages of one CfP.
+    Every record is kept in memory for `summary()` and, with a log_path, appended
+    to a JSON lines file as soon as the stage ends.
+    """
+    def __init__(self, label: str = "", log_path: str = ""):
+        self.label = label
+        self.log_path = log_path
+        self.records = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, **fields):
+        start = time.monotonic()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.add(name, time.monotonic() - start, error=error, **fields)
+
+    def add(self, name: str, seconds: float, **fields) -> None:
+        record = {
+            "label": self.label,
+            "stage": name,
+            "seconds": round(seconds, 6),
+            "thread": threading.current_thread().name,
+            "timestamp": time.time()
+        }
+        record.update({k: v for k, v in fields.items() if v is not None})
+        with self.lock:
+            self.records.append(record)
+        record_stage(record)
+        if self.log_path:
+            with write_lock, open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+
+    def summary(self) -> dict:
+        """Count, total and maximum seconds per stage, in the order the stages were first seen."""
+        summary = {}
+        with self.lock:
+            records = list(self.records)
+        for record in records:
+            entry = summary.setdefault(record["stage"], {"count": 0, "total": 0.0, "max": 0.0})
+            entry["count"] += 1
+            entry["total"] += record["seconds"]
+            entry["max"] = max(entry["max"], record["seconds"])
+        return summary
+
+def timed(timer: StageTimer, name: str, **fields):
+    """timer.stage(name), or a no-op when no timer is given."""
+    return timer.stage(name, **fields) if timer is not None else nullcontext()
+
+def merge_summaries(summaries: list) -> dict:
+    """Combine the summaries of several timers (e.g. all the documents of a batch)."""
+    merged = {}
+    for summary in summaries:
+        for stage, entry in summary.items():
+            total = merged.setdefault(stage, {"count": 0, "total": 0.0, "max": 0.0})
+            total["count"] += entry["count"]
+            total["total"] += entry["total"]
+            total["max"] = max(total["max"], entry["max"])
+    return merged
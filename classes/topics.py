@@ -3,8 +3,10 @@ os.environ['FAISS_OPT_LEVEL'] = ''  # do this BEFORE importing any faiss library
 
 import pickle
 import re
+from functools import lru_cache
 import spacy
 from sentence_transformers import SentenceTransformer
+from .timing import timed
 
 # Load spacy model at module level so it's loaded only once
 try:
@@ -15,6 +17,17 @@ except OSError:
     subprocess.check_call([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
     nlp = spacy.load("en_core_web_sm")
 
+@lru_cache(maxsize=None)
+def load_embedding_model() -> SentenceTransformer:
+    """Sentence embedding model, loaded once per process."""
+    return SentenceTransformer("all-MiniLM-L6-v2")
+
+@lru_cache(maxsize=None)
+def load_openalex_topics() -> dict:
+    """FAISS index and sentences of the OpenAlex topics, loaded once per process."""
+    with open('data_sources/openalex.pickle', 'rb') as handle:
+        return pickle.load(handle)
+
 class Topics:
     def __init__(self, topics_list: list, preferred_threshold: float = 0.60):
         self.topics_list = topics_list
@@ -22,9 +35,8 @@ class Topics:
         self.preferred_threshold = preferred_threshold
         
         if self.topics_list:
-            with open('data_sources/openalex.pickle', 'rb') as handle:
-                self.openalex = pickle.load(handle)
-            self.emb_model = SentenceTransformer("all-MiniLM-L6-v2")
+            self.openalex = load_openalex_topics()
+            self.emb_model = load_embedding_model()
         else:
             self.openalex = None
             self.emb_model = None
@@ -52,20 +64,23 @@ class Topics:
             
         return list(set(extracted))
 
-    def match_openalex_topics(self, debug=False, sim_threshold=0.6):
+    def match_openalex_topics(self, debug=False, sim_threshold=0.6, timer=None):
         if not self.topics_list or not self.openalex or not self.emb_model:
             return
             
         for topic in self.topics_list:
             if debug: print(f"----> {topic}")
             
-            subtopics = self.extract_subtopics(topic)
+            with timed(timer, "topics.spacy"):
+                subtopics = self.extract_subtopics(topic)
             matched_topics_dict = {}
             
             for sub in subtopics:
                 if debug: print(f"  Subtopic: {sub}")
-                embeddings = self.emb_model.encode([sub])
-                dists, similar_items = self.openalex["index"].search(embeddings, k=5)
+                with timed(timer, "topics.encode"):
+                    embeddings = self.emb_model.encode([sub])
+                with timed(timer, "topics.faiss"):
+                    dists, similar_items = self.openalex["index"].search(embeddings, k=5)
                 for pos, returned_item in enumerate(similar_items[0]): 
                     dist = float(dists[0][pos])
                     sim = 1.0 - dist
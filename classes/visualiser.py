@@ -251,8 +251,7 @@ class ConferenceVisualiser(CoreVisualiser):
                 if st.button("Save this setting!", use_container_width=True):
                     conf.topics.preferred_threshold = new_threshold
                     if filename and storage:
-                        loaded_data = storage.load(filename)
-                        storage.save(filename, conf.to_dict(), loaded_data.get("llm-output"))
+                        storage.update_preferred_threshold(filename, new_threshold)
                         st.toast("Settings saved successfully!", icon="✅")
             
             for topic, openalex_topics in conf.topics.enhanced_topics.items():
@@ -265,3 +264,14 @@ class ConferenceVisualiser(CoreVisualiser):
                         else:
                             line += f" :blue-badge[📎 {oatopic}]"
                 st.markdown(line)
+
+    def display_timings(self, timings: dict) -> None:
+        """Stage timings of the last run (see StageTimer.summary), slowest first."""
+        self.add_header("Processing Times")
+        rows = [
+            {"Stage": stage, "Calls": entry["count"], "Total (s)": round(entry["total"], 3),
+             "Mean (s)": round(entry["total"] / entry["count"], 3), "Max (s)": round(entry["max"], 3)}
+            for stage, entry in sorted(timings.items(), key=lambda item: item[1]["total"], reverse=True)
+        ]
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        st.caption("Stages overlap: organisers, topics and venues run concurrently after the LLM stage, and the OpenAlex, encoding and FAISS entries are included in their stage.")
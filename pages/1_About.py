@@ -121,8 +121,8 @@ st.write("")
 st.subheader("5. Database Storage and Parallel Call for Papers", anchor="database-storage-and-parallel-call-for-papers")
 st.markdown(
     "All processed events are stored in a MongoDB collection. To capture the full context of a conference:\n\n"
-    "* **Parallel Arrays**: Stored documents save the raw Call for Papers texts in a parallel `cfps` array synchronized 1-to-1 with file names.\n"
-    "* **Multiple CFPs**: If a conference has multiple Calls for Papers associated with it (e.g. from different tracks or update cycles), the second text is added to the MongoDB list, preserving all sources for search and reading."
+    "* **Parallel Arrays**: Stored documents reference the raw Call for Papers texts in a parallel `cfp_refs` array synchronized 1-to-1 with file names. The texts themselves are stored once, compressed, in a separate `cfp_texts` collection keyed by their content hash, so identical reposts are not duplicated.\n"
+    "* **Multiple CFPs**: If a conference has multiple Calls for Papers associated with it (e.g. from different tracks or update cycles), a reference to the second text is added to the MongoDB list, preserving all sources for search and reading."
 )
 
 st.write("")
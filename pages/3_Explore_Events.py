@@ -5,13 +5,13 @@ os.environ['FAISS_OPT_LEVEL'] = ''  # do this BEFORE importing any faiss library
 
 import streamlit as st
 import configparser
-import pymongo
-from rapidfuzz import fuzz
 from pathlib import Path
 
 from classes.visualiser import ConferenceVisualiser
 from classes.conference import Conference
 from classes.storage import ConferenceStorage
+from classes import metrics
+from classes.search import search_events
 
 # Ensure configuration is loaded
 if 'config' not in st.session_state:
@@ -19,6 +19,7 @@ if 'config' not in st.session_state:
     st.session_state['config'].read('config.ini')
 
 config = st.session_state['config']
+metrics.start_from_config(config)
 vis = ConferenceVisualiser()
 
 def check_page_change(page_name):
@@ -52,32 +53,27 @@ vis.local('assets/css/mycss.css')
 with st.sidebar:
     vis.add_logo()
 
-# Check storage settings to ensure MongoDB is enabled
-storage_type = config.get('STORAGE', 'type', fallback='file')
-storage_type = storage_type.split('#')[0].split(';')[0].strip()
+# Storage shared by all reruns and sessions (the file storage keeps its manifest in memory, MongoDB its connection pool)
+dest_folder = config.get('FOLDERS', 'destination_folder', fallback='processed_cfps')
 
-if storage_type not in ['mongodb', 'both']:
-    st.warning("⚠️ The **Explore Events** search page requires MongoDB to be active. Please enable it by setting `type = mongodb` or `type = both` in the `[STORAGE]` section of your `config.ini` file.")
-    vis.render_footer()
-    st.stop()
-
-# Connect to MongoDB
-uri = config.get('MONGODB', 'uri', fallback='mongodb://localhost:27017/')
-db_name = config.get('MONGODB', 'db_name', fallback='coci')
+@st.cache_resource
+def get_storage(dest_folder):
+    storage = ConferenceStorage(dest_folder)
+    storage.page_events(limit=1)  # Triggers exception if the storage cannot be read (exceptions are not cached)
+    return storage
 
 try:
-    client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=2000)
-    client.server_info()  # Triggers exception if connection fails
-    db = client[db_name]
+    storage = get_storage(dest_folder)
 except Exception as e:
-    st.error(f"❌ Failed to connect to the MongoDB server. Please verify that your MongoDB service is running on `{uri}`. Error details: {e}")
+    uri = config.get('MONGODB', 'uri', fallback='mongodb://localhost:27017/')
+    st.error(f"❌ Failed to read the processed events. If MongoDB is enabled, please verify that your MongoDB service is running on `{uri}`. Error details: {e}")
     vis.render_footer()
     st.stop()
 
 # ----------------- EVENT DETAILS VIEW -----------------
 if 'selected_event_id' in st.session_state:
     selected_id = st.session_state['selected_event_id']
-    event_doc = db["events"].find_one({"_id": selected_id})
+    event_doc = storage.get_event(selected_id)
     
     if not event_doc:
         st.error(f"Event with ID {selected_id} not found in the database.")
@@ -91,27 +87,11 @@ if 'selected_event_id' in st.session_state:
         
         st.divider()
         conf = Conference.from_dict(event_doc.get("processed", {}))
-        dest_folder = config.get('FOLDERS', 'destination_folder', fallback='processed_cfps')
-        storage = ConferenceStorage(dest_folder)
         filenames = event_doc.get("filenames", [])
         filename = filenames[0] if filenames else f"event_{selected_id}"
         
         # Check if there is a CFP text saved
-        cfps = event_doc.get("cfps", [])
-        
-        cfp_text = ""
-        if isinstance(cfps, list):
-            try:
-                idx = filenames.index(filename)
-                if idx < len(cfps):
-                    cfp_text = cfps[idx]
-            except ValueError:
-                if cfps:
-                    cfp_text = cfps[0]
-        elif isinstance(cfps, dict):
-            cfp_text = cfps.get(filename, "")
-            if not cfp_text and cfps:
-                cfp_text = next(iter(cfps.values()))
+        cfp_text = storage.event_cfp_text(event_doc, filename)
             
         if cfp_text:
             tab1, tab2 = st.tabs(["**Results**", "**Read Call for Papers**"])
@@ -158,7 +138,13 @@ else:
     results = []
 
     if mode == 'lucky':
-        results = list(db["events_index"].find().sort([("index", -1)]).limit(10))
+        events, _ = storage.page_events(limit=10, projection=["processed.event_name", "processed.conference_series", "processed.year"])
+        results = [{
+            "index": event["_id"],
+            "event_name": event.get("processed", {}).get("event_name", ""),
+            "conference_series": event.get("processed", {}).get("conference_series", ""),
+            "year": event.get("processed", {}).get("year", "")
+        } for event in events]
         st.subheader("Last 10 events added to the system")
     elif mode == 'search':
         query = st.session_state.get('search_term', '').strip()
@@ -166,60 +152,15 @@ else:
             st.warning("Please enter a query in the search box first.")
         else:
             # Load event records to search by topics in addition to name and series
-            all_events = list(db["events"].find({}, {
-                "_id": 1,
-                "index": 1,
-                "processed.event_name": 1,
-                "processed.event_acronym": 1,
-                "processed.conference_series": 1,
-                "processed.year": 1,
-                "processed.topics": 1
-            }))
-            matched = []
-            
-            for doc in all_events:
-                processed = doc.get("processed", {})
-                name = processed.get("event_name", "")
-                acronym = processed.get("event_acronym", "")
-                series = processed.get("conference_series", "")
-                year = processed.get("year", "")
-                topics = processed.get("topics", [])
-                idx = doc.get("index") or doc.get("_id")
-                
-                # Check fuzzy similarities
-                name_score = fuzz.WRatio(query.lower(), name.lower())
-                acronym_score = fuzz.WRatio(query.lower(), acronym.lower())
-                series_score = fuzz.WRatio(query.lower(), series.lower())
-                
-                # Check topics similarities
-                topic_score = 0
-                best_topic = ""
-                for t in topics:
-                    t_score = fuzz.WRatio(query.lower(), t.lower())
-                    if t_score > topic_score:
-                        topic_score = t_score
-                        best_topic = t
-                
-                max_score = max(name_score, acronym_score, series_score, topic_score)
-                
-                if max_score >= 60:  # Relevancy threshold (stricter 60% match score)
-                    match_reason = ""
-                    if max_score == topic_score and topic_score > 70:
-                        match_reason = f"Matched topic: *'{best_topic}'*"
-                        
-                    matched.append({
-                        "index": idx,
-                        "event_name": name,
-                        "event_acronym": acronym,
-                        "conference_series": series,
-                        "year": year,
-                        "similarity": max_score,
-                        "match_reason": match_reason
-                    })
-            
-            # Sort by similarity score descending, and then by Index ID descending
-            matched.sort(key=lambda x: (x.get("similarity", 0), x.get("index", 0)), reverse=True)
-            results = matched
+            all_events = list(storage.iter_events([
+                "index",
+                "processed.event_name",
+                "processed.event_acronym",
+                "processed.conference_series",
+                "processed.year",
+                "processed.topics"
+            ]))
+            results = search_events(all_events, query)
             st.subheader(f"Search results for '{query}' ({len(results)} matches)")
 
     # Display list of events
@@ -5,13 +5,13 @@ os.environ['FAISS_OPT_LEVEL'] = ''  # do this BEFORE importing any faiss library
 
 import streamlit as st
 import configparser
-import pymongo
-from rapidfuzz import fuzz
 from pathlib import Path
 
 from classes.visualiser import ConferenceVisualiser
 from classes.conference import Conference
 from classes.storage import ConferenceStorage
+from classes import metrics
+from classes.search import aggregate_organisers, search_organisers
 
 # Ensure configuration is loaded
 if 'config' not in st.session_state:
@@ -19,6 +19,7 @@ if 'config' not in st.session_state:
     st.session_state['config'].read('config.ini')
 
 config = st.session_state['config']
+metrics.start_from_config(config)
 vis = ConferenceVisualiser()
 
 def check_page_change(page_name):
@@ -52,97 +53,44 @@ vis.local('assets/css/mycss.css')
 with st.sidebar:
     vis.add_logo()
 
-# Check storage settings to ensure MongoDB is enabled
-storage_type = config.get('STORAGE', 'type', fallback='file')
-storage_type = storage_type.split('#')[0].split(';')[0].strip()
+# Storage shared by all reruns and sessions (the file storage keeps its manifest in memory, MongoDB its connection pool)
+dest_folder = config.get('FOLDERS', 'destination_folder', fallback='processed_cfps')
 
-if storage_type not in ['mongodb', 'both']:
-    st.warning("⚠️ The **Explore Organisers** page requires MongoDB to be active. Please enable it by setting `type = mongodb` or `type = both` in the `[STORAGE]` section of your `config.ini` file.")
-    vis.render_footer()
-    st.stop()
-
-# Connect to MongoDB
-uri = config.get('MONGODB', 'uri', fallback='mongodb://localhost:27017/')
-db_name = config.get('MONGODB', 'db_name', fallback='coci')
+@st.cache_resource
+def get_storage(dest_folder):
+    storage = ConferenceStorage(dest_folder)
+    storage.page_events(limit=1)  # Triggers exception if the storage cannot be read (exceptions are not cached)
+    return storage
 
 try:
-    client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=2000)
-    client.server_info()  # Triggers exception if connection fails
-    db = client[db_name]
+    storage = get_storage(dest_folder)
 except Exception as e:
-    st.error(f"❌ Failed to connect to the MongoDB server. Please verify that your MongoDB service is running on `{uri}`. Error details: {e}")
+    uri = config.get('MONGODB', 'uri', fallback='mongodb://localhost:27017/')
+    st.error(f"❌ Failed to read the processed events. If MongoDB is enabled, please verify that your MongoDB service is running on `{uri}`. Error details: {e}")
     vis.render_footer()
     st.stop()
 
 
 # Caching the unique organisers aggregation across all events
 @st.cache_data(ttl=60)
-def get_all_organisers(mongo_uri, database_name):
-    agg_client = pymongo.MongoClient(mongo_uri)
-    agg_db = agg_client[database_name]
-    
-    events_list = list(agg_db["events"].find({}, {
-        "_id": 1,
-        "index": 1,
-        "processed.event_name": 1,
-        "processed.event_acronym": 1,
-        "processed.conference_series": 1,
-        "processed.year": 1,
-        "processed.organisers": 1
-    }))
+def get_all_organisers(dest_folder):
+    events_list = list(get_storage(dest_folder).iter_events([
+        "index",
+        "processed.event_name",
+        "processed.event_acronym",
+        "processed.conference_series",
+        "processed.year",
+        "processed.organisers",
+        "saved_at"
+    ]))
     
-    organisers_map = {}
-    for doc in events_list:
-        processed = doc.get("processed", {})
-        event_info = {
-            "index": doc.get("index") or doc.get("_id"),
-            "event_name": processed.get("event_name", ""),
-            "event_acronym": processed.get("event_acronym", ""),
-            "conference_series": processed.get("conference_series", ""),
-            "year": processed.get("year", "")
-        }
-        
-        for org in processed.get("organisers", []):
-            name = org.get("organiser_name", "").strip()
-            if not name:
-                continue
-                
-            orcid = org.get("orcid", "")
-            openalex = org.get("openalex_page", "")
-            
-            # Unique key combining ORCID, OpenAlex, or lowercase name
-            key = orcid or openalex or name.lower()
-            
-            if key not in organisers_map:
-                organisers_map[key] = {
-                    "key": key,
-                    "name": name,
-                    "openalex_name": org.get("openalex_name", ""),
-                    "affiliation": org.get("organiser_affiliation", ""),
-                    "orcid": orcid,
-                    "openalex_page": openalex,
-                    "affiliation_ror": org.get("affiliation_ror", ""),
-                    "country": org.get("organiser_country", ""),
-                    "events": [event_info]
-                }
-            else:
-                entry = organisers_map[key]
-                # Avoid duplicates in organised events list
-                if not any(e["index"] == event_info["index"] for e in entry["events"]):
-                    entry["events"].append(event_info)
-                    
-                # Merge profile details if they were previously missing
-                for field in ["openalex_name", "affiliation", "orcid", "openalex_page", "affiliation_ror", "country"]:
-                    if not entry.get(field) and org.get(field):
-                        entry[field] = org.get(field)
-                        
-    return list(organisers_map.values())
+    return aggregate_organisers(events_list)
 
 
 # ----------------- LEVEL 1: EVENT DETAILS VIEW -----------------
 if 'selected_event_id' in st.session_state:
     selected_id = st.session_state['selected_event_id']
-    event_doc = db["events"].find_one({"_id": selected_id})
+    event_doc = storage.get_event(selected_id)
     
     if not event_doc:
         st.error(f"Event with ID {selected_id} not found in the database.")
@@ -158,26 +106,11 @@ if 'selected_event_id' in st.session_state:
             
         st.divider()
         conf = Conference.from_dict(event_doc.get("processed", {}))
-        dest_folder = config.get('FOLDERS', 'destination_folder', fallback='processed_cfps')
-        storage = ConferenceStorage(dest_folder)
         filenames = event_doc.get("filenames", [])
         filename = filenames[0] if filenames else f"event_{selected_id}"
         
         # Check if Call for Papers text is stored in the DB
-        cfps = event_doc.get("cfps", [])
-        cfp_text = ""
-        if isinstance(cfps, list):
-            try:
-                idx = filenames.index(filename)
-                if idx < len(cfps):
-                    cfp_text = cfps[idx]
-            except ValueError:
-                if cfps:
-                    cfp_text = cfps[0]
-        elif isinstance(cfps, dict):
-            cfp_text = cfps.get(filename, "")
-            if not cfp_text and cfps:
-                cfp_text = next(iter(cfps.values()))
+        cfp_text = storage.event_cfp_text(event_doc, filename)
                 
         if cfp_text:
             tab1, tab2 = st.tabs(["**Results**", "**Read Call for Papers**"])
@@ -193,7 +126,7 @@ if 'selected_event_id' in st.session_state:
 # ----------------- LEVEL 2: ORGANISER PROFILE VIEW -----------------
 elif 'selected_organiser_key' in st.session_state:
     org_key = st.session_state['selected_organiser_key']
-    organisers_list = get_all_organisers(uri, db_name)
+    organisers_list = get_all_organisers(dest_folder)
     org = next((o for o in organisers_list if o["key"] == org_key), None)
     
     if not org:
@@ -289,12 +222,13 @@ else:
     mode = st.session_state.get('org_search_mode')
     results = []
     
-    all_orgs = get_all_organisers(uri, db_name)
+    all_orgs = get_all_organisers(dest_folder)
 
     if mode == 'lucky':
-        # Sort organisers by the highest event index they contributed to (descending) to represent the "latest" added
+        # Sort organisers by their latest event (descending) to represent the "latest" added: the progressive
+        # index in MongoDB, the time the file was saved in file storage (where the index is the file stem)
         all_orgs_sorted = list(all_orgs)
-        all_orgs_sorted.sort(key=lambda x: max(e["index"] for e in x["events"]) if x["events"] else 0, reverse=True)
+        all_orgs_sorted.sort(key=lambda x: max(e.get("saved_at", e["index"]) for e in x["events"]) if x["events"] else 0, reverse=True)
         results = all_orgs_sorted[:10]
         st.subheader("Last 10 organisers added to the system")
     elif mode == 'search':
@@ -302,25 +236,7 @@ else:
         if not query:
             st.warning("Please enter a query in the search box first.")
         else:
-            matched = []
-            for org in all_orgs:
-                name = org.get("name", "")
-                oa_name = org.get("openalex_name", "")
-                aff = org.get("affiliation", "")
-                
-                # Check fuzzy matches
-                name_score = fuzz.WRatio(query.lower(), name.lower())
-                oa_name_score = fuzz.WRatio(query.lower(), oa_name.lower()) if oa_name else 0
-                aff_score = fuzz.WRatio(query.lower(), aff.lower()) if aff else 0
-                
-                max_score = max(name_score, oa_name_score, aff_score)
-                if max_score >= 60:  # 60% match score threshold
-                    org["similarity"] = max_score
-                    matched.append(org)
-            
-            # Sort by similarity score descending, and then by Name ascending
-            matched.sort(key=lambda x: (x.get("similarity", 0), x.get("name", "").lower()), reverse=True)
-            results = matched
+            results = search_organisers(all_orgs, query)
             st.subheader(f"Search results for '{query}' ({len(results)} matches)")
 
     # Display list of organisers
@@ -1,6 +1,7 @@
 import streamlit as st
 import json
 import os
+import time
 import configparser
 from io import StringIO
 import html
@@ -11,6 +12,8 @@ from classes.visualiser import ConferenceVisualiser
 from classes.conference import Conference
 from classes.call_for_paper import CallForPaper
 from classes.storage import ConferenceStorage
+from classes.job_queue import ProcessingQueue
+from classes import metrics
 
 def read_config_file():
     if 'config' not in st.session_state:
@@ -32,9 +35,93 @@ def check_page_change(page_name):
             if key in st.session_state:
                 del st.session_state[key]
 
+@st.cache_resource
+def get_processing_queue(_config, dest_folder: str) -> ProcessingQueue:
+    """One background queue per Streamlit server, shared by all sessions."""
+    return ProcessingQueue(
+        Orchestrator.from_config(_config),
+        ConferenceStorage(dest_folder),
+        max_workers=_config.getint('APP', 'processing_workers', fallback=2)
+    )
+
+def render_progress(placeholder, vis: ConferenceVisualiser, logs: list) -> None:
+    logs_html = "<br>".join([f"&gt; {msg}" for msg in logs])
+    spinner_html = f'''
+    <div style="display: flex; align-items: flex-start; margin-bottom: 20px; background-color: #f4f6f9; padding: 15px; border-radius: 5px; border: 1px solid #ddd;">
+        <img src="{vis.render_image('assets/gifs/cooking.gif')}" width="60" height="60" style="margin-right: 15px; margin-top: 5px;" />
+        <div style="font-size: 14px; font-family: monospace; color: #333;">
+            {logs_html}
+        </div>
+    </div>
+    '''
+    placeholder.markdown(spinner_html, unsafe_allow_html=True)
+
+def clear_jobs():
+    st.session_state.pop('processing_jobs', None)
+    if 'jobs' in st.query_params:
+        del st.query_params['jobs']
+
+def show_result(storage, filename: str, timings: dict = None):
+    loaded_data = storage.load(filename)
+    st.session_state['processed_timings'] = timings or {}
+    st.session_state['processed_conf'] = Conference.from_dict(loaded_data.get("processed"))
+    st.session_state['processed_filename'] = filename
+    st.session_state['processed_cfp_text'] = loaded_data.get("cfp_text", "")
+    st.rerun()
+
+def render_jobs(processing_queue: ProcessingQueue, storage, vis: ConferenceVisualiser) -> None:
+    """Progress rows while the uploaded CfPs are processed, then a summary table."""
+    entries = st.session_state['processing_jobs']
+    rows = []
+    for entry in entries:
+        job = processing_queue.get(entry["job_id"])
+        if job is None:
+            rows.append({"File": entry["filename"], "Status": "lost", "Event": "", "Organisers": 0, "Time (s)": 0.0,
+                         "Details": "The job is no longer available (the server may have been restarted)", "job": None})
+        else:
+            elapsed = (job["finished_at"] or time.time()) - (job["started_at"] or time.time())
+            details = job["error"] if job["error"] else (job["logs"][-1] if job["logs"] else "Waiting for a free worker...")
+            rows.append({"File": job["filename"], "Status": job["status"], "Event": job["event"],
+                         "Organisers": job["organisers"], "Time (s)": round(elapsed, 1), "Details": details, "job": job})
+
+    in_progress = [r for r in rows if r["Status"] in ("queued", "running")]
+
+    # A single upload goes straight to its results, as before
+    if len(rows) == 1 and not in_progress:
+        row = rows[0]
+        clear_jobs()
+        if row["Status"] in ("done", "cached"):
+            show_result(storage, row["File"], row["job"]["timings"] if row["job"] else None)
+        st.error(f"Processing **{row['File']}** failed: {row['Details']}")
+        return
+
+    if in_progress:
+        st.markdown(f"Processing **{len(rows)}** calls for papers in the background ({len(rows) - len(in_progress)} completed). You can leave this page open or come back to it later.")
+        for row in rows:
+            with st.container(border=True):
+                if row["job"] is not None and row["Status"] in ("queued", "running"):
+                    st.markdown(f"**{row['File']}** :blue-badge[{row['Status']}]")
+                    render_progress(st.empty(), vis, row["job"]["logs"][-3:] or ["Waiting for a free worker..."])
+                else:
+                    badge = "green-badge" if row["Status"] in ("done", "cached") else "red-badge"
+                    st.markdown(f"**{row['File']}** :{badge}[{row['Status']}] {row['Event']}")
+        time.sleep(1)
+        st.rerun()
+
+    if st.button("← Back to upload form", type="secondary"):
+        clear_jobs()
+        st.rerun()
+    st.subheader("Summary")
+    st.dataframe([{k: v for k, v in row.items() if k != "job"} for row in rows], use_container_width=True, hide_index=True)
+    for row in rows:
+        if row["Status"] in ("done", "cached"):
+            if st.button(f"View {row['File']}", key=f"view_{row['File']}"):
+                show_result(storage, row["File"], row["job"]["timings"] if row["job"] else None)
+
 def main():
     read_config_file()
     check_page_change("process_events")
+    metrics.start_from_config(st.session_state['config'])
     
     dest_folder = st.session_state['config']['FOLDERS']['destination_folder']
     storage = ConferenceStorage(dest_folder)
@@ -45,9 +132,6 @@ def main():
         page_icon="🌐"
     )
     
-    filename = ""
-    call_for_papers = None
-    
     vis = ConferenceVisualiser()
     
     vis.local('assets/css/bootstrap.min.css')
@@ -65,13 +149,23 @@ def main():
         st.session_state['processed_filename'] = ""
     if 'processed_cfp_text' not in st.session_state:
         st.session_state['processed_cfp_text'] = ""
+
+    processing_queue = get_processing_queue(st.session_state['config'], dest_folder)
+    # The job ids are also kept in the URL, so that a reloaded tab keeps following its jobs
+    if 'processing_jobs' not in st.session_state and st.query_params.get('jobs'):
+        st.session_state['processing_jobs'] = []
+        for job_id in st.query_params['jobs'].split(','):
+            job = processing_queue.get(job_id)
+            st.session_state['processing_jobs'].append({"filename": job["filename"] if job else job_id, "job_id": job_id})
         
     # BACK BUTTON VIEW (if processed)
     if st.session_state['processed_conf'] is not None:
-        if st.button("← Back to upload form", type="secondary"):
+        back_label = "← Back to summary" if st.session_state.get('processing_jobs') else "← Back to upload form"
+        if st.button(back_label, type="secondary"):
             st.session_state['processed_conf'] = None
             st.session_state['processed_filename'] = ""
             st.session_state['processed_cfp_text'] = ""
+            st.session_state['processed_timings'] = {}
             st.rerun()
             
         st.divider()
@@ -79,28 +173,34 @@ def main():
         filename = st.session_state['processed_filename']
         call_for_papers = st.session_state['processed_cfp_text']
         
-        tab1, tab2 = st.tabs(["**Results**", "**Read Call for Papers**"])
-        with tab1:
+        timings = st.session_state.get('processed_timings')
+        tab_names = ["**Results**", "**Read Call for Papers**"] + (["**Processing Times**"] if timings else [])
+        tabs = st.tabs(tab_names)
+        with tabs[0]:
             vis.display_main(conf, filename, storage)
-        with tab2:
+        with tabs[1]:
             cfp_obj = CallForPaper(call_for_papers)
             st.html(cfp_obj.get_rendered_html())
+        if timings:
+            with tabs[2]:
+                vis.display_timings(timings)
+
+    # PROCESSING VIEW (uploaded CfPs are processed in the background)
+    elif st.session_state.get('processing_jobs'):
+        render_jobs(processing_queue, storage, vis)
             
     # UPLOAD FORM VIEW
-    else:
+    if st.session_state['processed_conf'] is None and not st.session_state.get('processing_jobs'):
         # st.markdown(f"<h4 style='text-align: left; color: gray; margin-bottom: 30px;'>Welcome to the Conference Organisers and Content Identifier (COCI), an AI-powered tool for extracting and structuring metadata from <i><u>calls for papers</u></i>. Please upload your CfP as a .txt file using the form below to automatically identify conference details, organizers, and research topics.</h4>", unsafe_allow_html=True)
-        st.markdown("Please upload your CfP as a .txt file using the form below to automatically identify conference details, organizers, and research topics.")
+        st.markdown("Please upload your CfPs as .txt files using the form below to automatically identify conference details, organizers, and research topics. Several files can be uploaded at once.")
         margin_left_col, main_col, margin_right_col = st.columns([1, 2, 1])
         with main_col:
             # st.markdown("### Upload Call for Papers")
-            uploaded_file = st.file_uploader("Choose a file", type=["txt"])
+            uploaded_files = st.file_uploader("Choose files", type=["txt"], accept_multiple_files=True)
             
-            filename = ""
-            call_for_papers = None
-            if uploaded_file is not None:
-                filename = uploaded_file.name
-                cfp = CallForPaper(uploaded_file)
-                call_for_papers = cfp.text
+            calls_for_papers = {}
+            for uploaded_file in uploaded_files or []:
+                calls_for_papers[uploaded_file.name] = CallForPaper(uploaded_file).text
 
             # st.markdown("### Processing Mode")
             st.caption("**Cached**: Uses cache if available. **Mild Force**: Reuses LLM extractions but reruns matching. **Force**: Reprocesses everything from scratch.")
@@ -126,54 +226,32 @@ def main():
             st.rerun()
             
         if submitted:
-            if call_for_papers is None:
+            empty_files = [name for name, text in calls_for_papers.items() if len(text) == 0]
+            if not calls_for_papers:
                 st.error("Cannot process as no **call for papers** has been provided.")
-            elif len(call_for_papers) == 0:
-                st.error("The **call for papers** file is empty.")
+            elif empty_files:
+                st.error(f"The **call for papers** file is empty: {', '.join(empty_files)}.")
             else:
-                cached_llm_result = None
-                if mild_force and not to_recompute and storage.is_processed(filename):
-                    loaded_data = storage.load(filename)
-                    cached_llm_result = loaded_data.get("llm-output")
-
-                if not storage.is_processed(filename) or to_recompute or mild_force:
-                    api_url = st.session_state['config']['DEFAULT']['api_url']
-                    api_key = st.session_state['config']['DEFAULT']['api_key']
-                    referer = st.session_state['config']['TEAM']['website']
-                    title = st.session_state['config']['TEAM']['description']
-                    openalex_api = st.session_state['config']['OPENALEX']['openalex_api']
-                    
-                    progress_placeholder = st.empty()
-                    logs = []
-                    
-                    def update_progress(message: str):
-                        logs.append(message)
-                        logs_html = "<br>".join([f"&gt; {msg}" for msg in logs])
-                        spinner_html = f'''
-                        <div style="display: flex; align-items: flex-start; margin-bottom: 20px; background-color: #f4f6f9; padding: 15px; border-radius: 5px; border: 1px solid #ddd;">
-                            <img src="{vis.render_image('assets/gifs/cooking.gif')}" width="60" height="60" style="margin-right: 15px; margin-top: 5px;" />
-                            <div style="font-size: 14px; font-family: monospace; color: #333;">
-                                {logs_html}
-                            </div>
-                        </div>
-                        '''
-                        progress_placeholder.markdown(spinner_html, unsafe_allow_html=True)
-                    
-                    orchestrator = Orchestrator(api_url, api_key, referer, title, openalex_api)
-                    conf, llm_result = orchestrator.process(call_for_papers, progress_callback=update_progress, cached_llm_result=cached_llm_result)
-                    
-                    progress_placeholder.empty()
-                    
-                    storage.save(filename, conf.to_dict(), llm_result, call_for_papers)
-                else:
-                    loaded_data = storage.load(filename)
-                    conf = Conference.from_dict(loaded_data.get("processed"))
-                    if not call_for_papers and loaded_data.get("cfp_text"):
-                        call_for_papers = loaded_data["cfp_text"]
+                entries = []
+                for filename, call_for_papers in calls_for_papers.items():
+                    already_processed = storage.is_processed(filename)
+                    metrics.record_cache("processed", already_processed)
+                    cached_llm_result = None
+                    if mild_force and already_processed:
+                        loaded_data = storage.load(filename)
+                        cached_llm_result = loaded_data.get("llm-output")
+
+                    if not already_processed or to_recompute or mild_force:
+                        job_id = processing_queue.submit(filename, call_for_papers, cached_llm_result)
+                        entries.append({"filename": filename, "job_id": job_id})
+                    else:
+                        # Kept in the queue as well, so that a reloaded tab lists it with the other files
+                        processed = storage.load(filename).get("processed", {})
+                        job_id = processing_queue.add_cached(filename, processed.get("event_name", ""), len(processed.get("organisers", [])))
+                        entries.append({"filename": filename, "job_id": job_id})
                 
-                st.session_state['processed_conf'] = conf
-                st.session_state['processed_filename'] = filename
-                st.session_state['processed_cfp_text'] = call_for_papers
+                st.session_state['processing_jobs'] = entries
+                st.query_params['jobs'] = ",".join(e["job_id"] for e in entries)
                 st.rerun()
     vis.render_footer()
 
@@ -0,0 +1,101 @@
+import sys
+import argparse
+import configparser
+from pathlib import Path
+
+# Allow running the script from the root folder of the project (python utilities/compress_cfps.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.storage import StorageToMongo
+from classes.compression import METHODS, compress_text, compression_method, decompress_text
+from classes.serialization import dumps, loads
+from classes.file_utils import atomic_write
+
+def migrate_files(dest_folder: str, method: str, dry_run: bool) -> None:
+    """Move inline and uncompressed CfP texts of the file storage to compressed <stem>.cfp sidecar files."""
+    folder = Path(dest_folder)
+    converted = 0
+    saved_bytes = 0
+    for path in sorted(folder.glob("*.json")):
+        cfp_path = folder / f"{path.stem}.cfp"
+        legacy_path = folder / f"{path.stem}.cfp.txt"
+        data = None
+        if cfp_path.is_file():
+            raw = cfp_path.read_bytes()
+            if compression_method(raw) == method:
+                continue
+            text = decompress_text(raw)
+            old_size = len(raw)
+        elif legacy_path.is_file():
+            text = legacy_path.read_text(encoding='utf-8')
+            old_size = legacy_path.stat().st_size
+        else:
+            data = loads(path.read_bytes())
+            if not data.get("cfp_text"):
+                continue
+            text = data["cfp_text"]
+            old_size = len(text.encode("utf-8"))
+
+        compressed = compress_text(text, method)
+        converted += 1
+        saved_bytes += old_size - len(compressed)
+        if dry_run:
+            continue
+        atomic_write(cfp_path, compressed)
+        if legacy_path.is_file():
+            legacy_path.unlink()
+        if data is not None:
+            # Drop the inline copy only once the sidecar file is written
+            del data["cfp_text"]
+            atomic_write(path, dumps(data))
+    print(f"File storage ({dest_folder}): {converted} CfP texts {'to convert' if dry_run else 'converted'}, {saved_bytes / 1024:.0f} KB saved.")
+
+def migrate_mongo(uri: str, db_name: str, method: str, dry_run: bool) -> None:
+    """Move the texts still inline in the events (cfps array) to the cfp_texts collection, and recompress the collection."""
+    storage = StorageToMongo(uri, db_name, method)
+    moved = 0
+    for doc in storage.events.find({"cfps": {"$exists": True}}, {"filenames": 1, "cfps": 1}):
+        moved += 1
+        if not dry_run:
+            storage.events.update_one(
+                {"_id": doc["_id"]},
+                {"$set": {"cfp_refs": storage.cfp_refs_of(doc)}, "$unset": {"cfps": ""}}
+            )
+    print(f"MongoDB ({db_name}): {moved} events with inline CfP texts {'to move' if dry_run else 'moved'} to cfp_texts.")
+
+    converted = 0
+    saved_bytes = 0
+    for cfp_doc in storage.cfp_texts.find({}):
+        stored = cfp_doc["text"]
+        if compression_method(stored) == method and (method != "none" or isinstance(stored, str)):
+            continue
+        new_text = storage.compress_cfp(decompress_text(stored))
+        saved_bytes += size_of(stored) - size_of(new_text)
+        converted += 1
+        if not dry_run:
+            storage.cfp_texts.update_one({"_id": cfp_doc["_id"]}, {"$set": {"text": new_text}})
+    print(f"MongoDB ({db_name}): {converted} CfP texts {'to convert' if dry_run else 'converted'}, {saved_bytes / 1024:.0f} KB saved.")
+
+def size_of(value) -> int:
+    return len(value.encode("utf-8") if isinstance(value, str) else value)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress the stored CfP texts of existing COCI data (file storage and/or MongoDB) and move inline MongoDB texts to the cfp_texts collection")
+    parser.add_argument("--method", choices=METHODS, help="Compression method (default: cfp_compression in config.ini, or zlib)")
+    parser.add_argument("--storage", choices=["file", "mongodb", "both"], help="Storage to migrate (default: type in config.ini)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be converted")
+    args = parser.parse_args()
+
+    config = configparser.ConfigParser()
+    config.read('config.ini')
+    method = args.method or config.get('STORAGE', 'cfp_compression', fallback='zlib').strip()
+    storage_type = args.storage or config.get('STORAGE', 'type', fallback='file').split('#')[0].split(';')[0].strip()
+
+    if storage_type in ['file', 'both']:
+        migrate_files(config.get('FOLDERS', 'destination_folder', fallback='processed_cfps'), method, args.dry_run)
+    if storage_type in ['mongodb', 'both']:
+        migrate_mongo(config.get('MONGODB', 'uri', fallback='mongodb://localhost:27017/'),
+                      config.get('MONGODB', 'db_name', fallback='coci'), method, args.dry_run)
+
+if __name__ == "__main__":
+    main()
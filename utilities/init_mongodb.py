@@ -55,6 +55,20 @@ def initialize_database():
         ("year", pymongo.ASCENDING)
     ], unique=True)
 
+    # 3. Setup cfp_texts collection (CfP texts keyed by their SHA-256, referenced by events.cfp_refs)
+    print("Setting up 'cfp_texts' collection...")
+    if "cfp_texts" not in db.list_collection_names():
+        db.create_collection("cfp_texts")
+
+    # 4. Setup counters collection (atomic allocation of the progressive event index)
+    print("Setting up 'counters' collection...")
+    max_doc = idx_coll.find_one(sort=[("index", -1)])
+    db["counters"].update_one(
+        {"_id": "events"},
+        {"$max": {"value": max_doc["index"] if max_doc else 0}},
+        upsert=True
+    )
+
     print("\nDatabase initialization completed successfully!")
     print("MongoDB tables/collections and indexes are ready.")
 
@@ -19,7 +19,7 @@ def reset_database():
 
     # Confirm action
     if not args.force:
-        confirm = input(f"WARNING: This will drop all data in the 'events' and 'events_index' collections in database '{db_name}'. Are you sure? (y/N): ")
+        confirm = input(f"WARNING: This will drop all data in the 'events', 'events_index', 'cfp_texts' and 'counters' collections in database '{db_name}'. Are you sure? (y/N): ")
         if confirm.lower().strip() not in ['y', 'yes']:
             print("Reset cancelled.")
             sys.exit(0)
@@ -40,6 +40,12 @@ def reset_database():
     print(f"Dropping collection 'events_index' in '{db_name}'...")
     db["events_index"].drop()
 
+    print(f"Dropping collection 'cfp_texts' in '{db_name}'...")
+    db["cfp_texts"].drop()
+
+    print(f"Dropping collection 'counters' in '{db_name}'...")
+    db["counters"].drop()
+
     # Recreate collections and indexes
     print("Recreating collections and indexes...")
     db["events"].create_index("filenames")